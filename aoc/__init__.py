@@ -0,0 +1,45 @@
+"""
+Solutions to Advent of Code 2019.
+
+Each day's Python solution, dayN/python/main.py, has a function
+`solve(part, input_text)` returning the answer to that part. `solve` here
+imports a day's module on first use, so running one day only imports what
+that day needs. From the repository root:
+
+    python -m aoc DAY [PART] [--input FILE]
+"""
+import importlib
+import os
+import sys
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Days with a Python solution
+DAYS = (1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11)
+PARTS = (1, 2)
+
+
+def solver(day):
+    """Return the `solve(part, input_text)` function of a day."""
+    if day not in DAYS:
+        raise ValueError(f"No Python solution for day {day}")
+    # The day directories are namespace packages under the repository root
+    if REPO_ROOT not in sys.path:
+        sys.path.insert(0, REPO_ROOT)
+    return importlib.import_module(f'day{day}.python.main').solve
+
+
+def input_path(day):
+    return os.path.join(REPO_ROOT, f'day{day}', 'input.txt')
+
+
+def read_input(day):
+    with open(input_path(day)) as f:
+        return f.read()
+
+
+def solve(day, part, input_text=None):
+    """Solve a part of a day, on the checked-in input by default."""
+    if input_text is None:
+        input_text = read_input(day)
+    return solver(day)(part, input_text)
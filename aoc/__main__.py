@@ -0,0 +1,42 @@
+import argparse
+import sys
+import time
+
+from . import PARTS, __doc__ as DESCRIPTION, read_input, solver
+
+
+def main():
+    parser = argparse.ArgumentParser(description=DESCRIPTION.splitlines()[1])
+    parser.add_argument('day', type=int)
+    parser.add_argument('part', type=int, nargs='?', choices=PARTS)
+    parser.add_argument('--input', metavar='FILE',
+                        help="puzzle input (default: dayN/input.txt)")
+    parser.add_argument('--time', action='store_true',
+                        help="print how long each part took")
+    args = parser.parse_args()
+
+    try:
+        solve = solver(args.day)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.input is None:
+        input_text = read_input(args.day)
+    else:
+        with open(args.input) as f:
+            input_text = f.read()
+
+    for part in PARTS if args.part is None else (args.part,):
+        start = time.perf_counter()
+        answer = solve(part, input_text)
+        elapsed = time.perf_counter() - start
+
+        answer = str(answer)
+        if '\n' in answer:
+            answer = '\n' + answer
+        print(f"Part {part}: {answer}")
+        if args.time:
+            print(f"  ({elapsed*1000:.1f} ms)", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,14 @@
+"""
+Benchmark suite for the Python solutions of every day.
+
+Run from the repository root:
+
+    python -m benchmarks [--repeat N] [--scale N] [--only NAME ...]
+        [--baseline FILE] [--save-baseline] [--report FILE]
+
+Every part of every day is solved on its checked-in input and, where a
+generator exists, on a synthetic input `--scale` times as large. Results
+are compared against the stored baseline (benchmarks/baseline.json) and
+regressions make the command exit with status 1. `--report` writes the results as
+JSON; `--save-baseline` stores them as the new baseline.
+"""
@@ -0,0 +1,88 @@
+import argparse
+import json
+import os
+import platform
+import sys
+
+from . import __doc__ as DESCRIPTION
+from .suite import benchmarks, compare, measure
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                'baseline.json')
+
+
+def load_baseline(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)['benchmarks']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=DESCRIPTION.splitlines()[1])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--scale', type=int, default=2,
+                        help="size of the synthetic inputs, 1 to skip them")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--only', nargs='+', metavar='NAME',
+                        help="only run benchmarks of these days or names")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="allowed time and memory growth, as a fraction")
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--report', metavar='FILE')
+    args = parser.parse_args()
+
+    baseline = load_baseline(args.baseline)
+    results = {}
+    regressions = {}
+    for benchmark in benchmarks(args.scale, args.seed):
+        names = {benchmark.name, f"day{benchmark.day}"}
+        if args.only and not names & set(args.only):
+            continue
+        result = measure(benchmark, args.repeat)
+        result['regressions'] = compare(
+            result, baseline.get(benchmark.name), args.tolerance
+        )
+        results[benchmark.name] = result
+        if result['regressions']:
+            regressions[benchmark.name] = result['regressions']
+
+        if result['status'] == 'ok':
+            summary = (
+                f"{result['time']*1000:9.1f} ms {result['peak_memory']:>12} B"
+                f" {result['instructions']:>10} instr"
+            )
+        else:
+            summary = f"  {result['error']}"
+        flag = '  REGRESSION: ' + '; '.join(result['regressions']) \
+            if result['regressions'] else ''
+        print(f"{benchmark.name:<16}{summary}{flag}", file=sys.stderr)
+
+    report = {
+        'python': platform.python_version(),
+        'scale': args.scale,
+        'repeat': args.repeat,
+        'benchmarks': results,
+        'regressions': regressions,
+    }
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump(report, f, indent=2)
+    if args.save_baseline:
+        # Keep the baseline of benchmarks that weren't run this time
+        with open(args.baseline, 'w') as f:
+            json.dump({
+                'python': report['python'],
+                'benchmarks': {
+                    name: {k: v for k, v in result.items()
+                           if k != 'regressions'}
+                    for name, result in {**baseline, **results}.items()
+                },
+            }, f, indent=2)
+            f.write('\n')
+    return 1 if regressions and not args.save_baseline else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
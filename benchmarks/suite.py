@@ -0,0 +1,147 @@
+"""
+Run the day solvers and compare their measurements against a baseline.
+
+Each benchmark solves one part of one day on one input, through
+`aoc.solve`. A benchmark's measurements are:
+
+- time: best wall time in seconds over the repeats
+- peak_memory: peak bytes allocated through Python, from one extra run
+  under tracemalloc
+- instructions: Intcode instructions executed in this process (programs
+  run in worker processes aren't counted)
+- output: digest of the answer
+"""
+import contextlib
+import hashlib
+import random
+import time
+import tracemalloc
+
+from aoc import DAYS, PARTS, read_input, solver
+from intcode.vm import Program
+
+from . import synthetic
+
+# Slowdowns smaller than this many seconds are never regressions, so tiny
+# benchmarks don't flag on timer noise.
+MIN_TIME_DELTA = 0.005
+
+
+class Benchmark:
+    """One part of one day solved on one input."""
+
+    def __init__(self, name, day, part, input_text):
+        self.name = name
+        self.day = day
+        self.part = part
+        self.input_text = input_text
+
+    def run(self):
+        """Solve the part once and return the answer."""
+        return solver(self.day)(self.part, self.input_text)
+
+
+def benchmarks(scale=2, seed=0):
+    """
+    Return every benchmark: each part on its checked-in input and, for
+    days with a generator, on a synthetic input `scale` times as large.
+    """
+    res = []
+    for day in DAYS:
+        inputs = [('', read_input(day))]
+        generator = synthetic.GENERATORS.get(day)
+        if generator is not None and scale > 1:
+            rng = random.Random(f"{seed}:{day}")
+            inputs.append(
+                (f"@x{scale}", generator(inputs[0][1], scale, rng))
+            )
+        for suffix, input_text in inputs:
+            for part in PARTS:
+                name = f"day{day}-part{part}{suffix}"
+                res.append(Benchmark(name, day, part, input_text))
+    return res
+
+
+@contextlib.contextmanager
+def count_instructions():
+    """
+    Count the Intcode instructions executed by every Program in this
+    process while the context is active. Yields a one item list holding
+    the count.
+    """
+    counter = [0]
+    execute = Program._execute
+
+    def counting_execute(self, single_step):
+        before = self._instruction_count
+        try:
+            return execute(self, single_step)
+        finally:
+            counter[0] += self._instruction_count - before
+
+    Program._execute = counting_execute
+    try:
+        yield counter
+    finally:
+        Program._execute = execute
+
+
+def measure(benchmark, repeat=3):
+    """Run a benchmark and return its measurements as a dict."""
+    res = {'day': benchmark.day, 'part': benchmark.part}
+    try:
+        best = float('inf')
+        for _ in range(repeat):
+            with count_instructions() as instructions:
+                start = time.perf_counter()
+                output = benchmark.run()
+                best = min(best, time.perf_counter() - start)
+
+        tracemalloc.start()
+        try:
+            benchmark.run()
+            _, peak_memory = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    except Exception as e:
+        res.update(status='error', error=f"{type(e).__name__}: {e}")
+        return res
+
+    res.update(
+        status='ok',
+        time=best,
+        peak_memory=peak_memory,
+        instructions=instructions[0],
+        output=hashlib.sha256(str(output).encode()).hexdigest()[:16],
+    )
+    return res
+
+
+def compare(result, baseline, tolerance=0.25):
+    """
+    Return a list of regressions of `result` against its `baseline`
+    measurements: failing where the baseline passed, a changed answer, time
+    or peak memory more than `tolerance` (a fraction) above the baseline,
+    or more instructions.
+    """
+    if baseline is None or baseline['status'] != 'ok':
+        return []
+    if result['status'] != 'ok':
+        return [f"status ok -> {result['status']}"]
+
+    res = []
+    if result['output'] != baseline['output']:
+        res.append("output changed")
+    if (result['time'] > baseline['time'] * (1 + tolerance)
+            and result['time'] - baseline['time'] > MIN_TIME_DELTA):
+        res.append(f"time {baseline['time']:.4f}s -> {result['time']:.4f}s")
+    if result['peak_memory'] > baseline['peak_memory'] * (1 + tolerance):
+        res.append(
+            f"peak memory {baseline['peak_memory']} -> {result['peak_memory']}"
+        )
+    if result['instructions'] > baseline['instructions']:
+        res.append(
+            f"instructions {baseline['instructions']} -> "
+            f"{result['instructions']}"
+        )
+    return res
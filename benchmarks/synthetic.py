@@ -0,0 +1,78 @@
+"""
+Generators for scaled-up synthetic puzzle inputs.
+
+Each generator takes the checked-in input text, a scale factor and a
+random.Random, and returns an input about `scale` times the size of the
+real one with the same shape, so the solvers' scaling can be measured.
+Intcode days have no generator: their input is a fixed program.
+"""
+import string
+
+
+def day1(text, scale, rng):
+    count = len(text.split()) * scale
+    return '\n'.join(str(rng.randint(50000, 150000)) for _ in range(count))
+
+
+def day3(text, scale, rng):
+    wires = []
+    for line in text.splitlines():
+        segments = []
+        for _ in range(len(line.split(',')) * scale):
+            segments.append(f"{rng.choice('UDLR')}{rng.randint(1, 999)}")
+        wires.append(','.join(segments))
+    return '\n'.join(wires)
+
+
+def day6(text, scale, rng):
+    # Random tree where each body orbits one of the last hundred added, so
+    # the tree is deep like the real one rather than bushy.
+    count = len(text.splitlines()) * scale
+    alphabet = string.ascii_uppercase + string.digits
+    names = ['COM']
+    used = {'COM', 'YOU', 'SAN'}
+    while len(names) <= count:
+        name = ''.join(rng.choice(alphabet) for _ in range(3))
+        if name not in used:
+            used.add(name)
+            names.append(name)
+    orbits = [
+        f"{names[rng.randint(max(0, i - 100), i - 1)]}){names[i]}"
+        for i in range(1, len(names))
+    ]
+    orbits.append(f"{rng.choice(names)})YOU")
+    orbits.append(f"{rng.choice(names)})SAN")
+    rng.shuffle(orbits)
+    return '\n'.join(orbits)
+
+
+def day8(text, scale, rng, width=25, height=6):
+    layer_count = len(text.strip()) // (width * height) * scale
+    digits = [
+        ''.join(rng.choice('0122') for _ in range(width * height))
+        for _ in range(layer_count - 1)
+    ]
+    # The last layer has no transparent pixels so every pixel has a color
+    digits.append(''.join(rng.choice('01') for _ in range(width * height)))
+    return ''.join(digits)
+
+
+def day10(text, scale, rng):
+    lines = text.splitlines()
+    density = text.count('#') / sum(len(line) for line in lines)
+    # Scale the area, keeping the map square-ish and as dense as the real one
+    side = round((len(lines) * len(lines[0]) * scale) ** 0.5)
+    return '\n'.join(
+        ''.join('#' if rng.random() < density else '.' for _ in range(side))
+        for _ in range(side)
+    )
+
+
+# Day number -> generator
+GENERATORS = {
+    1: day1,
+    3: day3,
+    6: day6,
+    8: day8,
+    10: day10,
+}
@@ -1,29 +1,73 @@
-import numpy as np
+import sys
+
+# Bytes of input parsed at a time by `required_fuel_from_file`
+CHUNK_SIZE = 1 << 23
 
 
 def get_required_fuel(masses):
+    import numpy as np
+
     return np.maximum(masses // 3 - 2, 0)
 
 
-input_file = "../input.txt"
+def get_total_fuel(masses):
+    """
+    Fuel for all modules, including the fuel needed to carry the fuel
+    (part 2). All masses are iterated at once, dropping the ones whose
+    additional fuel reached zero, so this takes about log3(max mass) steps.
+    """
+    total = 0
+    fuel = get_required_fuel(masses)
+    while len(fuel):
+        fuel = fuel[fuel > 0]
+        total += int(fuel.sum())
+        fuel = get_required_fuel(fuel)
+    return total
+
+
+def parse_masses(text):
+    import numpy as np
+
+    # Parses any whitespace separated integers in C
+    return np.fromstring(text, dtype=np.int64, sep=' ')
+
+
+def required_fuel(part, masses):
+    if part == 1:
+        return int(get_required_fuel(masses).sum())
+    if part == 2:
+        return get_total_fuel(masses)
+    raise ValueError(f"Invalid part: {part}")
+
 
-with open(input_file, 'r') as f:
-    input_text = f.read()
+def solve(part, input_text):
+    return required_fuel(part, parse_masses(input_text))
 
-module_masses = np.array([int(line) for line in input_text.splitlines()])
-required_fuel = np.sum(get_required_fuel(module_masses))
 
-print(f"Required fuel (part 1): {required_fuel}")
+def required_fuel_from_file(part, path, chunk_size=CHUNK_SIZE):
+    """
+    Solve a part for the masses in file `path`, reading about `chunk_size`
+    bytes at a time so memory use doesn't grow with the file.
+    """
+    total = 0
+    rest = b''
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            # Don't split a mass between chunks
+            cut = chunk.rfind(b'\n') + 1
+            if not cut:
+                rest += chunk
+                continue
+            total += required_fuel(part, parse_masses(rest + chunk[:cut]))
+            rest = chunk[cut:]
+    return total + required_fuel(part, parse_masses(rest))
 
 
-required_fuel = 0
-for module_mass in module_masses:
-    required_module_fuel = get_required_fuel(module_mass)
-    unaccounted_fuel = required_module_fuel
-    while unaccounted_fuel > 0:
-        additional_fuel = get_required_fuel(unaccounted_fuel)
-        required_module_fuel += additional_fuel
-        unaccounted_fuel = additional_fuel
-    required_fuel += required_module_fuel
+if __name__ == '__main__':
+    input_file = sys.argv[1] if len(sys.argv) > 1 else "../input.txt"
 
-print(f"Required fuel (part 2): {required_fuel}")
+    print(f"Required fuel (part 1): {required_fuel_from_file(1, input_file)}")
+    print(f"Required fuel (part 2): {required_fuel_from_file(2, input_file)}")
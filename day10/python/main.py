@@ -1,6 +1,17 @@
-import itertools
 from collections import defaultdict
-from decimal import Decimal
+from fractions import Fraction
+import math
+import os
+
+# Number of station-to-asteroid directions `visible_counts` holds at once
+BLOCK_ELEMENTS = 1 << 21
+
+# Most entries of a `step_table`: larger fields compute their steps with
+# gcds instead
+MAX_TABLE_SIZE = 1 << 24
+
+# The asteroid field in a worker process, set by _init_worker
+_worker_field = None
 
 
 def angle(c):
@@ -11,15 +22,15 @@ def angle(c):
     """
     dx, dy = c
     if dx == 0:
-        tan_angle = Decimal(0)
+        tan_angle = Fraction(0)
         index = 2*int(dy > 0)  # Indices 0 and 2 used for dx == 0
     else:
-        tan_angle = Decimal(dy) / Decimal(dx)
+        tan_angle = Fraction(dy, dx)
         index = 1 + 2*int(dx < 0)  # Indices 1 and 3 used for dx != 0
     return (index, tan_angle)
 
 
-def visualize(coords_by_angle_):
+def visualize(coords_by_angle_, x_len, y_len, ox, oy):
     coords = set().union(*coords_by_angle_.values())
     for y in range(y_len):
         for x in range(x_len):
@@ -32,90 +43,161 @@ def visualize(coords_by_angle_):
         print()
 
 
-input_file = "../input.txt"
-with open(input_file, 'r') as f:
-    input_text = f.read()
-
-# Test:
-# input_text = """.#....#####...#..
-# ##...##.#####..##
-# ##...#...#.#####.
-# ..#.....#...###..
-# ..#.#.....#....##"""
-
-# Test:
-# input_text = (
-# """.#..##.###...#######
-# ##.############..##.
-# .#.######.########.#
-# .###.#######.####.#.
-# #####.##.#.##.###.##
-# ..#####..#.#########
-# ####################
-# #.####....###.#.#.##
-# ##.#################
-# #####.##.###..####..
-# ..######..##.#######
-# ####.##.####...##..#
-# .#####..#.######.###
-# ##...#.##########...
-# #.##########.#######
-# .####.#.###.###.#.##
-# ....##.##.###..#####
-# .#.#.###########.###
-# #.#.#.#####.####.###
-# ###.##.####.##.#..##""")
-
-y_len = len(input_text.splitlines())
-x_len = len(input_text.splitlines()[0])
-
-asteroids = [
-    (x, y)
-    for y, line in enumerate(input_text.splitlines())
-    for x, char in enumerate(line)
-    if char == '#'
-]
-
 def shrink(x, y):
-    ax, ay = abs(x), abs(y)
-    gcd = max(i for i in range(1, max(ax, ay) + 1) if ax % i == ay % i == 0)
-    return x / gcd, y / gcd
-
-visible = [
-    (len({
-        shrink(ax - ox, ay - oy)
-        for (ax, ay) in asteroids
-        if ox != ax or oy != ay
-    }), ox, oy) for (ox, oy) in asteroids]
-
-print("Max visible (part 1):", max(visible))
-
-
-ox, oy = max(visible)[1:]
-coords = [(ax - ox, ay - oy) for (ax, ay) in asteroids]
-
-
-coords_by_angle = defaultdict(list)
-for c in coords:
-    if c != (0, 0):
-        coords_by_angle[angle(c)].append(c)
-coords_by_angle = dict(coords_by_angle)
-
-for angle in coords_by_angle.keys():
-    # Sort coordinates with the same angle by sum of coordinates, i.e. distance
-    # from origin.
-    coords_by_angle[angle].sort(key=lambda c: abs(c[0]) + abs(c[1]))
-
-vaporized = 0
-for angle in itertools.cycle(sorted(coords_by_angle.keys())):
-    # visualize(coords_by_angle)
-    # input()
-    try:
-        c = coords_by_angle[angle].pop(0)
-    except IndexError:
-        pass
+    """Smallest integer step (x, y) is a multiple of."""
+    gcd = math.gcd(x, y)
+    if gcd == 0:
+        return x, y
+    return x // gcd, y // gcd
+
+
+def get_asteroids(input_text):
+    return [
+        (x, y)
+        for y, line in enumerate(input_text.splitlines())
+        for x, char in enumerate(line)
+        if char == '#'
+    ]
+
+
+def step_table(extent):
+    """
+    Encoded smallest integer steps of every (dx, dy) with |dx| and |dy| up
+    to `extent`, as a flat array indexed by (dx + extent) * span + dy +
+    extent, where span is 2*extent + 1. A step (x, y) is encoded as
+    x * span + y.
+    """
+    import numpy as np
+
+    span = 2*extent + 1
+    dtype = np.int32 if span**2 < 2**31 else np.int64
+    offsets = np.arange(-extent, extent + 1, dtype=dtype)
+    dx, dy = offsets[:, np.newaxis], offsets[np.newaxis]
+    gcd = np.gcd(dx, dy)
+    gcd[gcd == 0] = 1
+    return (dx // gcd * span + dy // gcd).reshape(-1)
+
+
+def visible_counts(xs, ys, stations):
+    """
+    Number of asteroids visible from each of the asteroids with indices
+    `stations`, for the asteroids at coordinates (xs, ys) (NumPy arrays).
+
+    An asteroid is visible when no other one lies in the same direction,
+    reduced to its smallest integer step, so the count is the number of
+    distinct steps. A block of stations is handled at once: the steps from
+    every station to every asteroid are encoded as one integer each and
+    sorted per station, and the distinct ones counted. Steps come from a
+    `step_table` unless the field is too large for one.
+    """
+    import numpy as np
+
+    extent = int(max(xs.max() - xs.min(), ys.max() - ys.min()))
+    span = 2*extent + 1
+    table = step_table(extent) if span**2 <= MAX_TABLE_SIZE else None
+    dtype = np.int32 if span**2 < 2**31 else np.int64
+    xs, ys = xs.astype(dtype), ys.astype(dtype)
+    block = max(1, BLOCK_ELEMENTS // len(xs))
+    counts = []
+    for start in range(0, len(stations), block):
+        chunk = stations[start:start + block]
+        dx = xs - xs[chunk, np.newaxis]
+        dy = ys - ys[chunk, np.newaxis]
+        if table is not None:
+            steps = table[(dx + extent) * span + dy + extent]
+        else:
+            gcd = np.gcd(dx, dy)
+            # The station itself, which ends up as its own step of (0, 0)
+            gcd[gcd == 0] = 1
+            steps = dx // gcd * span + dy // gcd
+        steps.sort(axis=1)
+        # Distinct steps other than the station's own (0, 0)
+        counts.append(np.count_nonzero(steps[:, 1:] != steps[:, :-1], axis=1))
+    return np.concatenate(counts)
+
+
+def _init_worker(xs, ys):
+    global _worker_field
+    _worker_field = xs, ys
+
+
+def _visible_in_worker(stations):
+    return visible_counts(*_worker_field, stations)
+
+
+def best_station(asteroids, workers=None):
+    """
+    Return (number of visible asteroids, x, y) of the best station.
+
+    Stations are spread over `workers` processes (default: one per CPU).
+    With a single worker, or a field small enough to count in one block,
+    everything runs in this process.
+    """
+    import numpy as np
+
+    if not asteroids:
+        raise ValueError("No asteroids")
+    xs, ys = (np.array(c) for c in zip(*asteroids))
+    stations = np.arange(len(asteroids))
+    block = max(1, BLOCK_ELEMENTS // len(asteroids))
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers == 1 or len(asteroids) <= block:
+        counts = visible_counts(xs, ys, stations)
     else:
-        vaporized += 1
-        if vaporized == 200:
-            print("Asteroid number 200: (part 2)", (c[0] + ox, c[1] + oy))
-            break
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(
+            workers, initializer=_init_worker, initargs=(xs, ys)
+        ) as executor:
+            counts = np.concatenate(list(executor.map(
+                _visible_in_worker,
+                [stations[i:i + block] for i in range(0, len(stations), block)],
+            )))
+    return max(
+        (int(count), x, y) for count, (x, y) in zip(counts, asteroids))
+
+
+def solve(part, input_text):
+    # Test:
+    # input_text = """.#....#####...#..
+    # ##...##.#####..##
+    # ##...#...#.#####.
+    # ..#.....#...###..
+    # ..#.#.....#....##"""
+    asteroids = get_asteroids(input_text)
+    visible, ox, oy = best_station(asteroids)
+    if part == 1:
+        return visible
+    if part != 2:
+        raise ValueError(f"Invalid part: {part}")
+    if len(asteroids) <= 200:
+        raise ValueError("Fewer than 200 asteroids to vaporize")
+
+    # Asteroids in the same direction, nearest first
+    coords_by_step = defaultdict(list)
+    for ax, ay in asteroids:
+        c = (ax - ox, ay - oy)
+        if c != (0, 0):
+            coords_by_step[shrink(*c)].append(c)
+
+    # The laser hits the nearest asteroid in each direction per rotation,
+    # so the vaporizing order is by rotation, then angle
+    order = []
+    for step, coords in coords_by_step.items():
+        coords.sort(key=lambda c: abs(c[0]) + abs(c[1]))
+        step_angle = angle(step)
+        for rotation, c in enumerate(coords):
+            order.append((rotation, step_angle, c))
+    order.sort()
+    _, _, c = order[199]
+    return 100*(c[0] + ox) + c[1] + oy
+
+
+if __name__ == '__main__':
+    input_file = "../input.txt"
+    with open(input_file, 'r') as f:
+        input_text = f.read()
+
+    print("Max visible (part 1):", solve(1, input_text))
+    print("Asteroid number 200, 100*x + y (part 2):", solve(2, input_text))
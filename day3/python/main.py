@@ -1,39 +1,166 @@
-import numpy as np
+from bisect import bisect_left, bisect_right, insort
+from collections import defaultdict, namedtuple
+import itertools
+
+DIRECTIONS = {'U': (0, -1), 'D': (0, 1), 'R': (1, 0), 'L': (-1, 0)}
+
+# A straight piece of wire from (x0, y0) to (x1, y1), where `steps` is the
+# length of wire before (x0, y0)
+Segment = namedtuple('Segment', 'x0 y0 x1 y1 steps')
 
 
 def get_sections(line):
     return [(s[0], int(s[1:])) for s in line.split(',')]
 
 
-def get_coords(sections):
-    coords = set()
-    current_coord = np.array([0, 0])
+def get_segments(sections):
+    segments = []
+    x, y = 0, 0
+    steps = 0
     for direction, length in sections:
-        if direction == 'U':
-            dir_unit = np.array([0, -1])
-        elif direction == 'D':
-            dir_unit = np.array([0, 1])
-        elif direction == 'R':
-            dir_unit = np.array([1, 0])
-        elif direction == 'L':
-            dir_unit = np.array([-1, 0])
+        try:
+            dx, dy = DIRECTIONS[direction]
+        except KeyError:
+            raise ValueError(f"Invalid direction: {direction}") from None
+        segments.append(
+            Segment(x, y, x + dx*length, y + dy*length, steps))
+        x += dx*length
+        y += dy*length
+        steps += length
+    return segments
+
+
+def steps_to(segment, x, y):
+    """Length of wire up to point (x, y) on `segment`."""
+    return segment.steps + abs(x - segment.x0) + abs(y - segment.y0)
+
+
+def is_horizontal(segment):
+    return segment.y0 == segment.y1
+
+
+def crossings(horizontals, verticals):
+    """
+    Yield (x, y, horizontal, vertical) for every point where one of
+    `horizontals` crosses one of `verticals`.
+
+    Sweeps a vertical line left to right over the segments, keeping the
+    horizontal segments it currently cuts in a list sorted by y, so each
+    vertical segment finds the horizontals it crosses with two bisections.
+    """
+    # Events at the same x: horizontals start before verticals are checked
+    # and end after, so segments that just touch count as crossing
+    START, CHECK, END = range(3)
+    events = []
+    for i, h in enumerate(horizontals):
+        events.append((min(h.x0, h.x1), START, i))
+        events.append((max(h.x0, h.x1), END, i))
+    for i, v in enumerate(verticals):
+        events.append((v.x0, CHECK, i))
+    events.sort()
+
+    active = []  # (y, horizontal index)
+    for x, kind, i in events:
+        if kind == START:
+            insort(active, (horizontals[i].y0, i))
+        elif kind == END:
+            del active[bisect_left(active, (horizontals[i].y0, i))]
         else:
-            assert(False)
-        for _ in range(length):
-            current_coord += dir_unit
-            coords.add(tuple(current_coord))
-    return coords
+            v = verticals[i]
+            low = bisect_left(active, (min(v.y0, v.y1), -1))
+            high = bisect_right(active, (max(v.y0, v.y1), len(horizontals)))
+            for y, j in active[low:high]:
+                yield x, y, horizontals[j], v
+
+
+class Wire:
+    """A wire's segments, indexed by the line each of them lies on."""
+
+    def __init__(self, segments):
+        self.horizontals = [s for s in segments if is_horizontal(s)]
+        self.verticals = [s for s in segments if not is_horizontal(s)]
+        # (is horizontal, fixed coordinate) -> segments on that line
+        self.lines = defaultdict(list)
+        for s in segments:
+            horizontal = is_horizontal(s)
+            self.lines[horizontal, s.y0 if horizontal else s.x0].append(s)
+
+    def first_steps(self, x, y):
+        """
+        Length of wire up to the first time it passes (x, y), or None if
+        it never does.
+        """
+        res = None
+        for key, moving in (((True, y), x), ((False, x), y)):
+            for s in self.lines.get(key, ()):
+                ends = (s.x0, s.x1) if key[0] else (s.y0, s.y1)
+                if min(ends) <= moving <= max(ends):
+                    steps = steps_to(s, x, y)
+                    if res is None or steps < res:
+                        res = steps
+        return res
+
+
+def candidate_points(wires):
+    """
+    Yield points that include, among the points every wire passes, the
+    one closest to the origin and the one with the least combined delay.
+
+    A point all wires pass is either where two of them cross at right
+    angles, or on a line all of them run along. On such a line, between
+    consecutive segment ends, distance and combined delay are smallest at
+    an end or at the point nearest the origin (or next to the origin, as
+    the origin itself doesn't count), so only those are yielded.
+    """
+    for a, b in itertools.combinations(wires, 2):
+        for x, y, _, _ in crossings(a.horizontals, b.verticals):
+            yield x, y
+        for x, y, _, _ in crossings(b.horizontals, a.verticals):
+            yield x, y
+
+    for horizontal, fixed in set.intersection(*(set(w.lines) for w in wires)):
+        moving = {-1, 0, 1}
+        for w in wires:
+            for s in w.lines[horizontal, fixed]:
+                moving.update((s.x0, s.x1) if horizontal else (s.y0, s.y1))
+        for m in moving:
+            yield (m, fixed) if horizontal else (fixed, m)
+
+
+def intersections(wires):
+    """
+    Return {(x, y): [steps of each wire]} for candidate points that every
+    wire passes, other than the origin where they all start, with the
+    length of each wire up to its first visit of the point.
+    """
+    index = {}
+    for point in candidate_points(wires):
+        if point in index or point == (0, 0):
+            continue
+        steps = [w.first_steps(*point) for w in wires]
+        if None not in steps:
+            index[point] = steps
+    return index
+
 
+def solve(part, input_text):
+    wires = [
+        Wire(get_segments(get_sections(line)))
+        for line in input_text.splitlines()]
+    index = intersections(wires)
+    if not index:
+        raise ValueError("The wires don't intersect")
+    if part == 1:
+        return min(abs(x) + abs(y) for x, y in index)
+    if part == 2:
+        return min(sum(steps) for steps in index.values())
+    raise ValueError(f"Invalid part: {part}")
 
-input_file = "../input.txt"
-with open(input_file, 'r') as f:
-    input_text = f.read()
-wire_sections = [
-    get_sections(input_line) for input_line in input_text.splitlines()]
-wire_coords = [get_coords(s) for s in wire_sections]
-intersections = set.intersection(*wire_coords)
-min_distance = min(sum(np.absolute(coords)) for coords in intersections)
 
-print(f"Distance (part 1): {min_distance}")
+if __name__ == '__main__':
+    input_file = "../input.txt"
+    with open(input_file, 'r') as f:
+        input_text = f.read()
 
-# print(f"Inputs that produce {target} (part 2): {100*noun + verb}")
+    print(f"Distance (part 1): {solve(1, input_text)}")
+    print(f"Combined steps (part 2): {solve(2, input_text)}")
@@ -1,4 +1,5 @@
-from collections import Counter
+from collections import Counter, defaultdict
+
 
 def check_code_part1(code):
     digits = [int(d) for d in str(code)]
@@ -10,15 +11,6 @@ def check_code_part1(code):
             double_digit = True
     return double_digit
 
-min_ = 137683
-max_ = 596253
-
-count = 0
-for i in range(min_, max_ + 1):
-    count += check_code_part1(i)
-
-print(f"Valid codes (part 1): {count}")
-
 
 def check_code_part2(code):
     digits = [int(d) for d in str(code)]
@@ -27,9 +19,123 @@ def check_code_part2(code):
     counts = Counter(digits)
     return 2 in counts.values()
 
-count = 0
-for i in range(min_, max_ + 1):
-    count += check_code_part2(i)
 
+def _count_up_to(n):
+    """
+    Count the codes in 1..n valid under each rule set, as (part 1 count,
+    part 2 count).
+
+    Digit DP over the digits of n. A state is (started, last digit, length
+    of the current run of equal digits capped at 3, has a run of at least
+    two, has a run of exactly two). Digits must not decrease, so each
+    state only extends with digits from its last digit up. There are at
+    most a few hundred states, whatever the number of digits.
+    """
+    if n < 1:
+        return 0, 0
+
+    def extend(state, digit):
+        started, last, run, pair, exact = state
+        if not started:
+            if digit == 0:
+                return state
+            return (True, digit, 1, False, False)
+        if digit < last:
+            return None
+        if digit == last:
+            run = min(run + 1, 3)
+            return (True, digit, run, pair or run >= 2, exact)
+        return (True, digit, 1, pair, exact or run == 2)
+
+    # Prefixes below n's prefix, which can continue with any digit
+    below = defaultdict(int)
+    # The prefix equal to n's prefix, None once its digits decreased
+    tight = (False, 0, 0, False, False)
+    for n_digit in map(int, str(n)):
+        next_below = defaultdict(int)
+        for state, count in below.items():
+            for digit in range(10):
+                extended = extend(state, digit)
+                if extended is not None:
+                    next_below[extended] += count
+        if tight is not None:
+            for digit in range(n_digit):
+                extended = extend(tight, digit)
+                if extended is not None:
+                    next_below[extended] += 1
+            tight = extend(tight, n_digit)
+        below = next_below
+
+    ends = list(below.items())
+    if tight is not None:
+        ends.append((tight, 1))
+    part1 = part2 = 0
+    for (started, _, run, pair, exact), count in ends:
+        if started:
+            part1 += count * pair
+            part2 += count * (exact or run == 2)
+    return part1, part2
+
+
+def count_codes(min_, max_):
+    """
+    Count the codes in min_..max_ valid under the part 1 and the part 2
+    rules, without looking at each code, so ranges of any number of digits
+    are fine. Returns (part 1 count, part 2 count).
+    """
+    if min_ > max_:
+        return 0, 0
+    high = _count_up_to(max_)
+    low = _count_up_to(min_ - 1)
+    return high[0] - low[0], high[1] - low[1]
+
+
+def valid_codes(min_, max_, part):
+    """
+    Generate the codes in min_..max_ valid under the rules of `part`, in
+    increasing order. Only codes with non-decreasing digits are visited,
+    but there are still a lot of them in long ranges.
+    """
+    if part == 1:
+        check_code = check_code_part1
+    elif part == 2:
+        check_code = check_code_part2
+    else:
+        raise ValueError(f"Invalid part: {part}")
+
+    def codes(prefix, length):
+        # Non-decreasing continuations of `prefix` to `length` digits that
+        # can be in range
+        if length == 0:
+            if prefix >= min_:
+                yield prefix
+            return
+        scale = 10**length
+        for digit in range(prefix % 10 if prefix else 1, 10):
+            code = prefix*10 + digit
+            if code * (scale // 10) > max_:
+                return
+            if (code + 1) * (scale // 10) - 1 < min_:
+                continue
+            yield from codes(code, length - 1)
+
+    for length in range(len(str(max(min_, 1))), len(str(max_)) + 1):
+        for code in codes(0, length):
+            if check_code(code):
+                yield code
+
+
+def solve(part, input_text):
+    min_, max_ = (int(i) for i in input_text.strip().split('-'))
+    if part not in (1, 2):
+        raise ValueError(f"Invalid part: {part}")
+    return count_codes(min_, max_)[part - 1]
+
+
+if __name__ == '__main__':
+    input_file = "../input.txt"
+    with open(input_file, 'r') as f:
+        input_text = f.read()
 
-print(f"Valid codes (part 2): {count}")
+    print(f"Valid codes (part 1): {solve(1, input_text)}")
+    print(f"Valid codes (part 2): {solve(2, input_text)}")
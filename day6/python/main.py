@@ -1,46 +1,218 @@
-input_file = "../input.txt"
-with open(input_file, 'r') as f:
-    input_text = f.read()
-orbits = [orbit.split(')') for orbit in input_text.splitlines()]
-
-distances = {'COM': 0}
-orbit_count = 0
-
-for center, satelite in orbits:
-    if center in distances:
-        distances[satelite] = distances[center] + 1
-        orbit_count += distances[satelite]
-    else:
-        orbits.append((center, satelite))
+import sys
+
+import numpy as np
+
+
+def intern_names(tokens):
+    """
+    Number the distinct names in `tokens`, a NumPy bytes array. Returns
+    (sorted array of the names, id of each token).
+    """
+    if tokens.dtype.itemsize > 8:
+        return np.unique(tokens, return_inverse=True)
+    # Names of up to 8 bytes sort like big-endian 64-bit ints, which NumPy
+    # sorts several times faster than strings
+    keys = name_keys(tokens)
+    unique_keys, ids = np.unique(keys, return_inverse=True)
+    return unique_keys.astype('>u8').view('S8').astype(tokens.dtype), ids
+
+
+def name_keys(names):
+    """Native uint64 sort keys of a NumPy array of names up to 8 bytes."""
+    return names.astype('S8').view('>u8').astype(np.uint64)
+
+
+class OrbitMap:
+    """
+    Orbit tree with objects numbered 0..n-1.
+
+    `names` is a sorted NumPy array of object names (as bytes), so an
+    object's id is its index there, and `parents[i]` is the id of the
+    object that object i orbits, or -1 for objects that orbit nothing (COM).
+    """
+
+    def __init__(self, names, parents):
+        self.names = names
+        self.parents = parents
+        self._depths = None
+        self._ancestors = None
+        self._keys = None
+
+    @classmethod
+    def parse(cls, text):
+        if isinstance(text, str):
+            text = text.encode()
+        tokens = np.array(text.replace(b')', b'\n').split(), dtype=np.bytes_)
+        if len(tokens) % 2:
+            raise ValueError("Malformed orbit map")
+        names, ids = intern_names(tokens)
+        ids = ids.astype(np.int64 if len(names) > 2**31 else np.int32)
+        centers, satellites = ids[0::2], ids[1::2]
+        if len(satellites) and np.bincount(satellites).max() > 1:
+            raise ValueError("An object orbits more than one other object")
+        parents = np.full(len(names), -1, dtype=ids.dtype)
+        parents[satellites] = centers
+        return cls(names, parents)
+
+    def __len__(self):
+        return len(self.names)
 
-print(f"Number of orbits (part 1): {orbit_count}")
+    def id(self, name):
+        return int(self.ids([name])[0])
 
+    def ids(self, names):
+        """Ids of a sequence (or NumPy array) of names, str or bytes."""
+        names = np.asarray(names)
+        if names.dtype.kind == 'U':
+            names = np.char.encode(names)
+        table, query = self.names, names
+        if max(table.dtype.itemsize, query.dtype.itemsize) <= 8:
+            # Search integer keys, as in intern_names
+            table = self._name_keys()
+            query = name_keys(query)
+        # Searching in sorted order keeps the binary searches in cache
+        order = np.argsort(query)
+        ids = np.empty(len(query), dtype=np.int64)
+        ids[order] = np.searchsorted(table, query[order])
+        found = ids < len(table)
+        found[found] = table[ids[found]] == query[found]
+        if not found.all():
+            raise KeyError(names[~found][0].decode())
+        return ids
 
-orbits = {satelite: center for center, satelite in orbits}
+    def _name_keys(self):
+        if self._keys is None:
+            self._keys = name_keys(self.names)
+        return self._keys
 
-def get_orbit_chain(start, stop):
-    """Trace a node's orbits back to COM."""
-    current = start
-    res = []
-    while current != stop:
-        current = orbits[current]
-        res.append(current)
-    return list(reversed(res))
+    def depths(self):
+        """
+        Number of direct and indirect orbits of every object.
 
+        Computed by pointer jumping: every object keeps an ancestor and its
+        distance to it, and each round replaces the ancestor with the
+        ancestor's ancestor, doubling the distance covered. After
+        log2(depth of the tree) vectorized rounds every object points at
+        its root, however deep the tree, without any recursion.
+        """
+        if self._depths is not None:
+            return self._depths
 
-you_chain = get_orbit_chain('YOU', 'COM')
-santa_chain = get_orbit_chain('SAN', 'COM')
+        is_root = self.parents < 0
+        jump = np.where(is_root, np.arange(len(self)), self.parents)
+        depths = (~is_root).astype(np.int64)
+        for _ in range(len(self).bit_length() + 1):
+            if is_root[jump].all():
+                break
+            depths += depths[jump]
+            jump = jump[jump]
+        else:
+            raise ValueError("The orbit map has a cycle")
+        self._depths = depths
+        return depths
 
-for i, (y, s) in enumerate(zip(you_chain, santa_chain)):
-    if y != s:
-        break
-# i is now the index of the first nodes that differ, which is also the number
-# of nodes that are the same in both chains
+    def orbit_count(self):
+        """Total number of direct and indirect orbits."""
+        return int(self.depths().sum())
 
-distance = (
-    len(you_chain) - i  # Number of unique nodes in this chain
-    + len(santa_chain) - i  # Number of unique nodes in this chain
-    + 1  # Have to pass one common node
-    - 1  # Converting from number of nodes to number of steps
-)
-print(f"Distance (part2): {distance}")
+    def ancestors(self):
+        """
+        Binary lifting table: a list whose entry k is the array of every
+        object's 2**k-th ancestor. Roots are their own ancestors.
+        """
+        if self._ancestors is not None:
+            return self._ancestors
+
+        up = np.where(self.parents < 0, np.arange(len(self)), self.parents)
+        self._ancestors = [up]
+        max_depth = int(self.depths().max()) if len(self) else 0
+        for _ in range(1, max_depth.bit_length()):
+            up = up[up]
+            self._ancestors.append(up)
+        return self._ancestors
+
+    def common_ancestors(self, a, b):
+        """
+        Lowest common ancestor of each pair of objects in the id arrays `a`
+        and `b`, or -1 where they are in different trees. Takes
+        O(log depth) vectorized steps however many pairs there are.
+        """
+        depths = self.depths()
+        ancestors = self.ancestors()
+        a = np.asarray(a)
+        b = np.asarray(b)
+        # Make `a` the deeper one, then lift it to the depth of `b`
+        swap = depths[a] < depths[b]
+        a, b = np.where(swap, b, a), np.where(swap, a, b)
+        climb = depths[a] - depths[b]
+        for k, up in enumerate(ancestors):
+            a = np.where(climb >> k & 1, up[a], a)
+        # Lift both while their ancestors differ, largest jumps first
+        for up in reversed(ancestors):
+            differ = up[a] != up[b]
+            a = np.where(differ, up[a], a)
+            b = np.where(differ, up[b], b)
+        parent_a, parent_b = ancestors[0][a], ancestors[0][b]
+        lca = np.where(a == b, a, parent_a)
+        # Pairs in different trees end up at two different roots
+        return np.where((a == b) | (parent_a == parent_b), lca, -1)
+
+    def distances(self, a, b):
+        """
+        Number of orbital transfers between each pair of objects in the id
+        arrays `a` and `b`.
+        """
+        depths = self.depths()
+        lca = self.common_ancestors(a, b)
+        if (lca < 0).any():
+            raise ValueError("Objects orbit different roots")
+        return depths[np.asarray(a)] + depths[np.asarray(b)] - 2*depths[lca]
+
+    def transfers(self, start, stop):
+        """
+        Number of orbital transfers to get from the object `start` orbits
+        to the object `stop` orbits.
+        """
+        return int(self.batch_transfers([start], [stop])[0])
+
+    def batch_transfers(self, starts, stops):
+        """`transfers` for each pair of names in `starts` and `stops`."""
+        a = self.parents[self.ids(starts)]
+        b = self.parents[self.ids(stops)]
+        if (a < 0).any() or (b < 0).any():
+            raise ValueError("Objects that orbit nothing can't transfer")
+        return self.distances(a, b)
+
+    def transfers_from_file(self, path):
+        """
+        Answer a file of queries, one `START STOP` pair of names per line,
+        returning an array of the `transfers` between each pair.
+        """
+        with open(path, 'rb') as f:
+            names = np.array(f.read().split(), dtype=np.bytes_)
+        if len(names) % 2:
+            raise ValueError("Malformed query file")
+        return self.batch_transfers(names[0::2], names[1::2])
+
+
+def solve(part, input_text):
+    orbit_map = OrbitMap.parse(input_text)
+    if part == 1:
+        return orbit_map.orbit_count()
+    if part == 2:
+        return orbit_map.transfers('YOU', 'SAN')
+    raise ValueError(f"Invalid part: {part}")
+
+
+if __name__ == '__main__':
+    input_file = "../input.txt"
+    with open(input_file, 'r') as f:
+        input_text = f.read()
+
+    if len(sys.argv) > 1:
+        # Answer a file of `START STOP` queries against the input map
+        for count in OrbitMap.parse(input_text).transfers_from_file(sys.argv[1]):
+            print(count)
+    else:
+        print(f"Number of orbits (part 1): {solve(1, input_text)}")
+        print(f"Distance (part2): {solve(2, input_text)}")
@@ -1,26 +1,205 @@
-import numpy as np
+import mmap
+import struct
+import sys
+import zlib
 
+WIDTH, HEIGHT = 25, 6
 
-input_file = "../input.txt"
-with open(input_file, 'r') as f:
-    input_text = f.read()
-image_data = np.array([int(i) for i in input_text.strip()]).reshape((-1, 6, 25))
+# Bytes of image decoded at a time
+CHUNK_SIZE = 1 << 23
 
-# Test:
-# image_data = np.array([int(i) for i in "123456789012"]).reshape((-1, 2, 3))
+BLACK, WHITE, TRANSPARENT = 0, 1, 2
 
-fewest_zeros = np.argmin([np.count_nonzero(layer == 0) for layer in image_data])
-number_of_ones = np.count_nonzero(image_data[fewest_zeros] == 1)
-number_of_twos = np.count_nonzero(image_data[fewest_zeros] == 2)
 
-print("Part 1:", number_of_ones*number_of_twos)
+def decode_layers(data, width=WIDTH, height=HEIGHT, chunk_size=CHUNK_SIZE):
+    """
+    Yield the layers of the image `data` (digits as a str, bytes or mmap)
+    as uint8 arrays of shape (layers, height, width), about `chunk_size`
+    bytes of image at a time.
+    """
+    import numpy as np
 
+    if isinstance(data, str):
+        data = data.encode()
+    layer_size = width * height
+    end = len(data)
+    while end and data[end - 1:end].isspace():
+        end -= 1
+    if end % layer_size:
+        raise ValueError(
+            f"Image of {end} digits isn't made of {width}x{height} layers")
 
-# Test:
-# image_data = np.array([int(i) for i in "0222112222120000"]).reshape((-1, 2, 2))
+    step = max(chunk_size // layer_size, 1) * layer_size
+    for start in range(0, end, step):
+        count = min(step, end - start)
+        layers = np.frombuffer(data, np.uint8, count, start) - ord('0')
+        # Non-digits wrapped around past 9
+        if (layers > 9).any():
+            raise ValueError("Invalid digit in image")
+        yield layers.reshape(-1, height, width)
 
-indices = np.expand_dims(np.argmax(image_data < 2, axis=0), axis=0)
-stacked = np.take_along_axis(image_data, indices, axis=0)
 
-print("Part 2:")
-print(np.masked_zeros(stacked))
+def fewest_zeros(layers):
+    """
+    Return (number of zeros, number of ones times number of twos) of the
+    layer with the fewest zeros in the `layers` array.
+    """
+    import numpy as np
+
+    flat = layers.reshape(len(layers), -1)
+    i = np.count_nonzero(flat == 0, axis=1).argmin()
+    layer = flat[i]
+    return (
+        int(np.count_nonzero(layer == 0)),
+        int(np.count_nonzero(layer == 1)) * int(np.count_nonzero(layer == 2)),
+    )
+
+
+class Compositor:
+    """
+    Image made by stacking layers front to back, each layer showing only
+    through the pixels that are still transparent.
+
+    Only the transparent pixels are looked at, and `add` stops once there
+    are none left, so compositing costs as much as the layers needed to
+    cover the image rather than the whole stack.
+    """
+
+    def __init__(self, width=WIDTH, height=HEIGHT):
+        import numpy as np
+
+        self.image = np.full((height, width), TRANSPARENT, dtype=np.uint8)
+        # Flat indices of the pixels still transparent
+        self._holes = np.arange(width * height)
+
+    @property
+    def done(self):
+        return not len(self._holes)
+
+    def add(self, layers):
+        """
+        Put the `layers` array behind the image. Returns True once every
+        pixel is opaque, when no later layer can change the image.
+        """
+        pixels = self.image.reshape(-1)
+        for layer in layers.reshape(len(layers), -1):
+            if self.done:
+                break
+            colors = layer[self._holes]
+            opaque = colors != TRANSPARENT
+            pixels[self._holes[opaque]] = colors[opaque]
+            self._holes = self._holes[~opaque]
+        return self.done
+
+
+def composite(chunks):
+    """
+    Composite the chunks of layers from `decode_layers`, reading no more
+    chunks once the image is opaque.
+    """
+    compositor = None
+    for layers in chunks:
+        if compositor is None:
+            _, height, width = layers.shape
+            compositor = Compositor(width, height)
+        if compositor.add(layers):
+            break
+    if compositor is None:
+        raise ValueError("Empty image")
+    return compositor.image
+
+
+def decode(chunks):
+    """
+    Fold the chunks of layers from `decode_layers` into (checksum of the
+    layer with the fewest zeros, composited image), one chunk at a time.
+    """
+    best = None
+    compositor = None
+    for layers in chunks:
+        if compositor is None:
+            _, height, width = layers.shape
+            compositor = Compositor(width, height)
+        candidate = fewest_zeros(layers)
+        if best is None or candidate[0] < best[0]:
+            best = candidate
+        compositor.add(layers)
+    if best is None:
+        raise ValueError("Empty image")
+    return best[1], compositor.image
+
+
+# Color -> character drawn by `render_text`
+TEXT_PIXELS = {BLACK: ' ', WHITE: '#', TRANSPARENT: '.'}
+
+# Color -> (gray, alpha) drawn by `render_png`
+PNG_PIXELS = {BLACK: (0, 255), WHITE: (255, 255), TRANSPARENT: (0, 0)}
+
+
+def render_text(image):
+    """Draw an image as lines of text, white pixels as '#'."""
+    return '\n'.join(
+        ''.join(TEXT_PIXELS[color] for color in row)
+        for row in image.tolist()
+    )
+
+
+def render_png(image, scale=8):
+    """
+    Encode an image as a PNG, with each pixel drawn as a `scale` x
+    `scale` square, and return the bytes of the file.
+    """
+    def chunk(kind, data):
+        return (
+            struct.pack('>I', len(data)) + kind + data
+            + struct.pack('>I', zlib.crc32(kind + data))
+        )
+
+    height, width = image.shape
+    rows = []
+    for row in image.tolist():
+        # Filter type 0 (None), then (gray, alpha) for each pixel
+        line = b'\0' + b''.join(
+            bytes(PNG_PIXELS[color]) * scale for color in row)
+        rows.extend([line] * scale)
+    # 8-bit grayscale with alpha (color type 4)
+    header = struct.pack('>IIBBBBB', width*scale, height*scale, 8, 4, 0, 0, 0)
+    return (
+        b'\x89PNG\r\n\x1a\n'
+        + chunk(b'IHDR', header)
+        + chunk(b'IDAT', zlib.compress(b''.join(rows)))
+        + chunk(b'IEND', b'')
+    )
+
+
+def decode_file(path, width=WIDTH, height=HEIGHT, chunk_size=CHUNK_SIZE):
+    """
+    `decode` the image in file `path`. The file is memory-mapped and
+    decoded a chunk at a time, so memory use doesn't grow with the image.
+    """
+    with open(path, 'rb') as f:
+        if not f.seek(0, 2):
+            raise ValueError("Empty image")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return decode(decode_layers(data, width, height, chunk_size))
+
+
+def solve(part, input_text):
+    if part == 1:
+        return decode(decode_layers(input_text))[0]
+    if part == 2:
+        return render_text(composite(decode_layers(input_text)))
+    raise ValueError(f"Invalid part: {part}")
+
+
+if __name__ == '__main__':
+    # Usage: main.py [IMAGE [PNG]]
+    input_file = sys.argv[1] if len(sys.argv) > 1 else "../input.txt"
+    checksum, image = decode_file(input_file)
+
+    print("Part 1:", checksum)
+    print("Part 2:")
+    print(render_text(image))
+    if len(sys.argv) > 2:
+        with open(sys.argv[2], 'wb') as f:
+            f.write(render_png(image))
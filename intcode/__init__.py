@@ -0,0 +1,24 @@
+"""Intcode virtual machine shared by the Intcode days (2, 5, 7, 9, 11)."""
+from .channels import Channel, ThreadSafeChannel
+from .loader import load_image, load_program, parse_program
+from .memory import Image, Memory
+from .search import (
+    first, noun_verb_output, search, search_amplifiers, solve_noun_verb,
+)
+from .snapshot import load as load_snapshot, save as save_snapshot
+from .vm import OP_CODES, Program, decode, run_program
+
+# The asyncio runtime is imported on first use, as importing asyncio takes
+# longer than running most programs.
+_AIO_NAMES = {'AsyncChannel', 'Deadlock', 'Network'}
+
+
+def __getattr__(name):
+    if name not in _AIO_NAMES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from . import aio
+    return getattr(aio, name)
+
+
+def __dir__():
+    return sorted(set(globals()) | _AIO_NAMES)
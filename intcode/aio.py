@@ -0,0 +1,128 @@
+"""
+Asyncio runtime for networks of cooperating Intcode programs.
+
+Each program runs as a task that executes until it needs input it doesn't
+have and then sleeps until something is put in its input channel, so only
+programs with pending input are ever scheduled. Programs in a network must
+use AsyncChannel for any channel they read from.
+"""
+import asyncio
+
+from .channels import Channel
+from .vm import Program
+
+
+class Deadlock(RuntimeError):
+    """Every program still running is waiting for input nobody will send."""
+
+
+class AsyncChannel(Channel):
+    """Single-threaded channel that wakes up a task waiting to read from it."""
+
+    def __init__(self, iterable=()):
+        super().__init__(iterable)
+        self._waiter = None
+        self._on_wake = None
+
+    def _wake(self):
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+            if self._on_wake is not None:
+                self._on_wake()
+
+    def put_nowait(self, value):
+        self.append(value)
+        self._wake()
+
+    put = put_nowait
+
+    def put_many(self, values):
+        self.extend(values)
+        self._wake()
+
+    async def wait(self, on_wake=None):
+        """
+        Wait until the channel isn't empty. `on_wake` is called as soon as
+        a value is put in the channel, before the waiting task gets to run.
+        """
+        while not self:
+            self._waiter = asyncio.get_running_loop().create_future()
+            self._on_wake = on_wake
+            try:
+                await self._waiter
+            finally:
+                self._waiter = None
+                self._on_wake = None
+
+    def _fail(self, exc):
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_exception(exc)
+
+
+class Network:
+    """A set of programs run together on one event loop."""
+
+    def __init__(self):
+        self.programs = []
+        self._blocked = 0
+        self._running = 0
+
+    def add(self, memory_data, stdin=None, stdout=None):
+        """Create a program in the network and return it."""
+        program = Program(
+            memory_data,
+            AsyncChannel() if stdin is None else stdin,
+            AsyncChannel() if stdout is None else stdout,
+        )
+        self.programs.append(program)
+        return program
+
+    def ring(self, memory_data, inputs):
+        """
+        Add programs connected in a ring, each one's output going to the
+        next one's input. Program i gets `inputs[i]` (a sequence) as its
+        first input. Returns the channels, channel i being program i's input.
+        """
+        channels = [AsyncChannel(values) for values in inputs]
+        for i, channel in enumerate(channels):
+            self.add(memory_data, channel, channels[(i + 1) % len(channels)])
+        return channels
+
+    def _unblock(self):
+        self._blocked -= 1
+
+    def _check_deadlock(self):
+        if self._running and self._blocked == self._running:
+            exc = Deadlock("All running programs are waiting for input")
+            for program in self.programs:
+                program.stdin._fail(exc)
+            raise exc
+
+    async def _run_program(self, program):
+        stdin = program.stdin
+        try:
+            while True:
+                program.run()
+                if program.halted():
+                    return
+                # Woken programs stop counting as blocked right away, not
+                # when they get to run, so that the deadlock check is exact.
+                self._blocked += 1
+                self._check_deadlock()
+                await stdin.wait(self._unblock)
+        finally:
+            self._running -= 1
+            if program.halted():
+                self._check_deadlock()
+
+    async def run(self):
+        """Run all programs until every one of them has halted."""
+        self._blocked = 0
+        self._running = len(self.programs)
+        await asyncio.gather(
+            *(self._run_program(program) for program in self.programs)
+        )
+
+    def instruction_counts(self):
+        """Instructions executed by each program, in the order they were added."""
+        return [program.instruction_count() for program in self.programs]
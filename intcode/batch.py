@@ -0,0 +1,256 @@
+"""
+Lockstep interpreter running one Intcode program on many inputs at once.
+
+Every lane has its own memory (a row of a 2-D int64 array), instruction
+pointer and relative base. Each step executes one instruction in every
+lane that can run, grouping lanes by op code so that each op is a handful
+of NumPy operations however many lanes execute it. Lanes whose instruction
+pointers diverge are fine; they just end up in different groups.
+
+Memory is int64 while every value fits. The first addition or
+multiplication that overflows, or big value written or fed in, switches
+the whole batch to an object array of Python ints, which is slower but
+exact. `overflow_counts` counts the results per lane that didn't fit in
+64 bits.
+
+Every lane's memory is dense, growing to cover the highest address the
+program touches, so unlike Program there is no sparse storage for high
+addresses: touching an address at or above DENSE_LIMIT is an IndexError.
+"""
+import numpy as np
+
+from .memory import DENSE_LIMIT, Image
+from .vm import INT64_MAX, INT64_MIN, OP_CODES
+
+
+class BatchProgram:
+    """
+    `lanes` copies of a program run in lockstep.
+
+    Input is given one value per lane at a time with `feed`, output is
+    collected per lane and returned by `outputs`. Lanes that run out of
+    input wait, and resume after the next `feed`:
+
+    >>> program = BatchProgram([3, 11, 3, 12, 1, 11, 12, 13, 4, 13, 99], 2)
+    >>> program.feed([1, 2])
+    >>> program.run()
+    >>> program.waiting.tolist()
+    [True, True]
+    >>> program.feed([10, 20])
+    >>> program.run()
+    >>> program.outputs()
+    [[11], [22]]
+    """
+
+    def __init__(self, memory_data, lanes):
+        if isinstance(memory_data, Image):
+            memory_data = memory_data.tolist()
+        try:
+            image = np.array(memory_data, dtype=np.int64)
+        except OverflowError:
+            image = np.array(memory_data, dtype=object)
+        self.memory = np.zeros((lanes, len(image) + 1024), dtype=image.dtype)
+        self.memory[:, :len(image)] = image
+        self.ip = np.zeros(lanes, dtype=np.int64)
+        self.rb = np.zeros(lanes, dtype=np.int64)
+        self.halted = np.zeros(lanes, dtype=bool)
+        self.waiting = np.zeros(lanes, dtype=bool)
+        self.instruction_counts = np.zeros(lanes, dtype=np.int64)
+        self.overflow_counts = np.zeros(lanes, dtype=np.int64)
+        self._inputs = np.zeros((lanes, 0), dtype=image.dtype)
+        self._input_ptr = np.zeros(lanes, dtype=np.int64)
+        self._output_lanes = []
+        self._output_values = []
+
+    @property
+    def lanes(self):
+        return len(self.ip)
+
+    def promoted(self):
+        """True once values are Python ints rather than int64."""
+        return self.memory.dtype == object
+
+    def _promote(self):
+        if not self.promoted():
+            self.memory = self.memory.astype(object)
+            self._inputs = self._inputs.astype(object)
+
+    def read(self, address):
+        """The value at `address` in every lane."""
+        self._ensure_size(address)
+        return self.memory[:, address].copy()
+
+    def write(self, address, values):
+        """Write `values` (a scalar or one value per lane) to `address`."""
+        self._ensure_size(address)
+        try:
+            self.memory[:, address] = values
+        except OverflowError:
+            self._promote()
+            self.memory[:, address] = values
+
+    def feed(self, values):
+        """Give every lane one more input value (a scalar or one per lane)."""
+        try:
+            column = np.asarray(values, dtype=self.memory.dtype)
+        except OverflowError:
+            self._promote()
+            column = np.asarray(values, dtype=object)
+        column = np.broadcast_to(column, (self.lanes,))
+        self._inputs = np.column_stack((self._inputs, column))
+        self.waiting[:] = False
+
+    def outputs(self):
+        """Everything each lane has output so far, as a list per lane."""
+        res = [[] for _ in range(self.lanes)]
+        if self._output_lanes:
+            lanes = np.concatenate(self._output_lanes)
+            values = np.concatenate(self._output_values)
+            for lane, value in zip(lanes.tolist(), values.tolist()):
+                res[lane].append(value)
+        return res
+
+    def _ensure_size(self, address):
+        if address < 0:
+            raise IndexError(f"Invalid memory address: {address}")
+        if address >= DENSE_LIMIT:
+            raise IndexError(
+                f"Memory address {address} is too high for a batch run")
+        size = self.memory.shape[1]
+        if address >= size:
+            grow = min(max(address + 1, 2 * size), DENSE_LIMIT) - size
+            self.memory = np.pad(self.memory, ((0, 0), (0, grow)))
+
+    def _fetch(self, lanes, raw, ip, rb, k):
+        """Raw parameter k (1-based), its modes and the address it refers to."""
+        self._ensure_size(int(ip.max()) + k)
+        param = self.memory[lanes, ip + k]
+        mode = raw // 10**(k + 1) % 10
+        if (mode > 2).any():
+            raise ValueError(f"Invalid parameter mode at {ip[mode > 2][0]}")
+        address = np.asarray(np.where(mode == 2, rb + param, param), dtype=np.int64)
+        address[mode == 1] = 0
+        if len(address):
+            if address.min() < 0:
+                raise IndexError(f"Invalid memory address: {address.min()}")
+            self._ensure_size(int(address.max()))
+        return param, mode, address
+
+    def _value(self, lanes, raw, ip, rb, k):
+        param, mode, address = self._fetch(lanes, raw, ip, rb, k)
+        return np.where(mode == 1, param, self.memory[lanes, address])
+
+    def _destination(self, lanes, raw, ip, rb, k):
+        _, mode, address = self._fetch(lanes, raw, ip, rb, k)
+        if (mode == 1).any():
+            raise ValueError(f"Immediate mode output parameter at {ip[mode == 1][0]}")
+        return address
+
+    def _execute(self, op, lanes, raw, ip, rb):
+        """Execute op code `op` in `lanes`. Returns the lanes that ran."""
+        if op == 99:
+            self.halted[lanes] = True
+            return lanes[:0]
+
+        if op == 3:
+            has_input = self._input_ptr[lanes] < self._inputs.shape[1]
+            self.waiting[lanes[~has_input]] = True
+            lanes, raw, ip, rb = (a[has_input] for a in (lanes, raw, ip, rb))
+            if not len(lanes):
+                return lanes
+            dst = self._destination(lanes, raw, ip, rb, 1)
+            self.memory[lanes, dst] = self._inputs[lanes, self._input_ptr[lanes]]
+            self._input_ptr[lanes] += 1
+            self.ip[lanes] = ip + 2
+            return lanes
+
+        x = self._value(lanes, raw, ip, rb, 1)
+        if op == 4:
+            self._output_lanes.append(lanes)
+            self._output_values.append(x)
+            self.ip[lanes] = ip + 2
+        elif op == 9:
+            self.rb[lanes] = rb + x
+            self.ip[lanes] = ip + 2
+        else:
+            y = self._value(lanes, raw, ip, rb, 2)
+            if op == 5:
+                self.ip[lanes] = np.where(x != 0, y, ip + 3)
+            elif op == 6:
+                self.ip[lanes] = np.where(x == 0, y, ip + 3)
+            else:
+                if op in (1, 2):
+                    value = self._arithmetic(op, lanes, x, y)
+                elif op == 7:
+                    value = (x < y).astype(np.int64)
+                else:
+                    value = (x == y).astype(np.int64)
+                dst = self._destination(lanes, raw, ip, rb, 3)
+                self.memory[lanes, dst] = value
+                self.ip[lanes] = ip + 4
+        return lanes
+
+    def _arithmetic(self, op, lanes, x, y):
+        """Add or multiply, promoting to Python ints on overflow."""
+        if self.promoted():
+            value = x + y if op == 1 else x * y
+            overflow = (value < INT64_MIN) | (value > INT64_MAX)
+        elif op == 1:
+            value = x + y
+            overflow = ((x ^ value) & (y ^ value)) < 0
+        else:
+            value = x * y
+            nonzero = np.where(x == 0, 1, x)
+            overflow = (x != 0) & (
+                (value // nonzero != y) | ((x == -1) & (y == value) & (y != 0))
+            )
+        if overflow.any():
+            np.add.at(self.overflow_counts, lanes[overflow], 1)
+            if not self.promoted():
+                self._promote()
+                x = x.astype(object)
+                y = y.astype(object)
+                value = x + y if op == 1 else x * y
+        return value
+
+    def step(self):
+        """
+        Execute one instruction in every lane that isn't halted or waiting
+        for input. Returns False if there was no such lane.
+        """
+        lanes = np.flatnonzero(~self.halted & ~self.waiting)
+        if not len(lanes):
+            return False
+        ip = self.ip[lanes]
+        raw = self.memory[lanes, ip]
+        ops = raw % 100
+        for op in np.unique(ops).tolist():
+            if op not in OP_CODES:
+                raise ValueError(f"Unknown op code {op}")
+            group = ops == op
+            ran = self._execute(
+                op, lanes[group], raw[group], ip[group], self.rb[lanes[group]]
+            )
+            self.instruction_counts[ran] += 1
+        return True
+
+    def run(self):
+        """Run until every lane has halted or is waiting for input."""
+        while self.step():
+            pass
+
+
+def run_batch(memory_data, inputs):
+    """
+    Run a program once per entry in `inputs`, each a sequence of input
+    values (all of the same length), and return each run's output.
+    """
+    inputs = [list(values) for values in inputs]
+    if len({len(values) for values in inputs}) > 1:
+        raise ValueError("Every run must get the same number of inputs")
+    program = BatchProgram(memory_data, len(inputs))
+    # One column at a time, so that `feed` promotes values too big for int64
+    for column in zip(*inputs):
+        program.feed(list(column))
+    program.run()
+    return program.outputs()
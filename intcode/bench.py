@@ -0,0 +1,159 @@
+"""
+Benchmark the Intcode VM on the day 9 BOOST program.
+
+Run from the repository root:
+
+    python -m intcode.bench [--repeat N] [--jit] [--batch LANES]
+        [--load CELLS] [path/to/input.txt]
+
+With --jit, also time the block-compiling JitProgram on the same input.
+With --load, time loading a generated program of CELLS values into an
+Image and measure the peak memory of doing so, reading the whole file as
+text versus through `intcode.loader`.
+With --batch, also compare the lockstep BatchProgram (needs NumPy) against
+sequential Programs on LANES day 2 noun/verb pairs.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from . import Program, load_image, load_program
+from .loader import clear_image_cache
+from .memory import Image
+
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+DEFAULT_INPUT = os.path.join(REPO_ROOT, 'day9', 'input.txt')
+NOUN_VERB_INPUT = os.path.join(REPO_ROOT, 'day2', 'input.txt')
+
+
+def run_boost(memory, mode, program_type=Program):
+    program = program_type(memory)
+    program.feed(mode)
+    program.run()
+    assert program.halted()
+    return program.drain()
+
+
+def time_boost(memory, mode, repeat, program_type=Program):
+    """Return (best time in seconds, output) over `repeat` runs."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = run_boost(memory, mode, program_type)
+        best = min(best, time.perf_counter() - start)
+    return best, output
+
+
+def time_noun_verb(lanes):
+    """Return (batch seconds, sequential seconds) for `lanes` noun/verb pairs."""
+    import numpy as np
+
+    from .batch import BatchProgram
+    from .search import noun_verb_output
+
+    image = Image(load_program(NOUN_VERB_INPUT))
+    nouns, verbs = np.divmod(np.arange(lanes), 100)
+
+    start = time.perf_counter()
+    program = BatchProgram(image, lanes)
+    program.write(1, nouns)
+    program.write(2, verbs)
+    program.run()
+    batch_output = program.read(0).tolist()
+    batch_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    output = [
+        noun_verb_output(image, noun, verb)
+        for noun, verb in zip(nouns.tolist(), verbs.tolist())
+    ]
+    sequential_time = time.perf_counter() - start
+    assert output == batch_output
+    return batch_time, sequential_time
+
+
+def load_as_text(path):
+    """Load an Image the simple way, for comparison with `load_image`."""
+    with open(path) as f:
+        return Image([int(i) for i in f.read().split(',')])
+
+
+def load_image_uncached(path):
+    clear_image_cache()
+    return load_image(path)
+
+
+def time_load(cells):
+    """
+    Return {loader name: (seconds, peak bytes)} for loading a generated
+    program of `cells` values into an Image.
+    """
+    rng = random.Random(cells)
+    res = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'program.txt')
+        with open(path, 'w') as f:
+            f.write(','.join(
+                str(rng.randint(-10**6, 10**6)) for _ in range(cells)
+            ))
+        loaders = [
+            ('text', load_as_text),
+            ('load_image', load_image_uncached),
+            ('load_image (cached)', load_image),
+        ]
+        for name, load in loaders:
+            start = time.perf_counter()
+            image = load(path)
+            elapsed = time.perf_counter() - start
+            assert len(image) == cells
+            del image
+
+            # tracemalloc slows loading down a lot, so measure separately
+            tracemalloc.start()
+            load(path)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            res[name] = (elapsed, peak)
+    return res
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('input_file', nargs='?', default=DEFAULT_INPUT)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--jit', action='store_true')
+    parser.add_argument('--batch', type=int, metavar='LANES')
+    parser.add_argument('--load', type=int, metavar='CELLS')
+    args = parser.parse_args()
+
+    program_types = [('', Program)]
+    if args.jit:
+        from .jit import JitProgram
+        program_types.append((' [jit]', JitProgram))
+
+    memory = load_program(args.input_file)
+    for mode, name in ((1, "test mode (part 1)"), (2, "sensor boost (part 2)")):
+        for suffix, program_type in program_types:
+            best, output = time_boost(memory, mode, args.repeat, program_type)
+            print(f"BOOST {name}{suffix}: {best*1000:.1f} ms (output={output})")
+
+    if args.batch:
+        batch_time, sequential_time = time_noun_verb(args.batch)
+        print(
+            f"Day 2 noun/verb x{args.batch}: batch {batch_time*1000:.1f} ms, "
+            f"sequential {sequential_time*1000:.1f} ms"
+        )
+
+    if args.load:
+        for name, (elapsed, peak) in time_load(args.load).items():
+            print(
+                f"Load {args.load} cells, {name}: {elapsed*1000:.1f} ms, "
+                f"peak {peak / 2**20:.1f} MiB"
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+I/O channels connecting Intcode programs to each other and to their callers.
+
+A channel is anything with `get_nowait`, `put_nowait`, `put_many`, `drain`
+and `peek`. `get_nowait` raises `queue.Empty` when there is nothing to read,
+like `queue.Queue` does.
+"""
+from collections import deque
+from queue import Empty, Queue
+
+
+class Channel(deque):
+    """
+    Fast channel for programs that all run on the same thread.
+
+    This is a plain deque, so there is no locking at all.
+    """
+
+    put = put_nowait = deque.append
+    put_many = deque.extend
+    qsize = deque.__len__
+
+    def get_nowait(self):
+        try:
+            return self.popleft()
+        except IndexError:
+            raise Empty from None
+
+    # There is nobody else to wait for on a single thread
+    get = get_nowait
+
+    def empty(self):
+        return not self
+
+    def drain(self):
+        """Remove and return everything in the channel."""
+        res = list(self)
+        self.clear()
+        return res
+
+    def peek(self):
+        """Return everything in the channel without removing it."""
+        return list(self)
+
+
+class ThreadSafeChannel(Queue):
+    """Unbounded channel for programs running on different threads."""
+
+    def __init__(self):
+        super().__init__()
+
+    def put_many(self, values):
+        values = list(values)
+        with self.mutex:
+            self.queue.extend(values)
+            self.unfinished_tasks += len(values)
+            self.not_empty.notify_all()
+
+    def drain(self):
+        """Remove and return everything in the channel."""
+        with self.mutex:
+            res = list(self.queue)
+            self.queue.clear()
+            self.not_full.notify_all()
+            return res
+
+    def peek(self):
+        """Return everything in the channel without removing it."""
+        with self.mutex:
+            return list(self.queue)
@@ -0,0 +1,342 @@
+"""
+Compile hot basic blocks of Intcode to Python functions.
+
+A basic block is a run of instructions starting at an address execution
+has reached a few times, ending with a jump, or just before an input or
+halt instruction. Each block is translated to Python source with parameter
+modes resolved, immediate operands folded into the code and position-mode
+addresses turned into direct page lookups.
+
+Intcode blocks are short (a few instructions), so calling a function per
+block would cost as much as interpreting it. Instead compiled blocks are
+grouped into region functions that loop, picking the block to run with an
+if-chain on the instruction pointer, and only return when execution
+leaves the region. Regions are compiled with `exec` and cached by their
+source, so programs loaded from the same image share the compiled code.
+
+Writes into the cells of a compiled block drop the block, and compiled
+code returns to the interpreter right after such a write, so
+self-modifying programs still see their own writes.
+"""
+import functools
+
+from .memory import PAGE_BITS, PAGE_MASK
+from .vm import OP_CODES, Program, decode
+
+# Number of times execution must reach an address before a block starting
+# there is compiled. Code that only runs once isn't worth compiling.
+HOT_THRESHOLD = 2
+
+# Longest block compiled, in instructions
+MAX_BLOCK_LENGTH = 64
+
+# Most blocks compiled per program. Each one adds a comparison to the
+# dispatch in its region.
+MAX_BLOCKS = 256
+
+# Indentation of block code inside the region function
+_BLOCK_INDENT = 4
+
+
+@functools.lru_cache(maxsize=256)
+def _compile_region(source):
+    namespace = {}
+    exec(compile(source, '<intcode region>', 'exec'), namespace)
+    return namespace['make_region']
+
+
+class _BlockWriter:
+    """Builds the source of one block."""
+
+    def __init__(self, page_count):
+        self.lines = []
+        self.page_count = page_count
+        self.temp = 0
+
+    def emit(self, line, indent=0):
+        self.lines.append('    ' * (_BLOCK_INDENT + indent) + line)
+
+    def cell(self, address):
+        """Return an expression for the value at a constant address."""
+        page, offset = address >> PAGE_BITS, address & PAGE_MASK
+        if 0 <= address and page < self.page_count:
+            return f'pages[{page}][{offset}]'
+        return f'mem[{address}]'
+
+    def address(self, mode, param):
+        """Emit code computing the address a parameter refers to."""
+        self.temp += 1
+        name = f'a{self.temp}'
+        self.emit(f'{name} = {param}' if mode == 0 else f'{name} = rb + {param}')
+        return name
+
+    def read(self, mode, param, static):
+        """
+        Return an expression for a parameter's value. `param` is the
+        parameter itself if `static`, otherwise an expression reading it
+        from memory.
+        """
+        if mode == 1:
+            return repr(param) if static else param
+        if mode == 0 and static:
+            return self.cell(param)
+        name = self.address(mode, param)
+        return (f'(pages[{name} >> {PAGE_BITS}][{name} & {PAGE_MASK}] '
+                f'if 0 <= {name} < n else mem[{name}])')
+
+    def write(self, mode, param, static, value, next_ip, count):
+        """Emit a write of `value`, leaving compiled code if it hits code."""
+        page = param >> PAGE_BITS if static else None
+        if mode == 0 and static and 0 <= param and page < self.page_count:
+            self.emit(f'if owned[{page}]:')
+            self.emit(f'{self.cell(param)} = {value}', 1)
+            self.emit('else:')
+            self.emit(f'mem[{param}] = {value}', 1)
+            self.emit(f'n = len(pages) << {PAGE_BITS}', 1)
+            dst = repr(param)
+        else:
+            dst = self.address(mode, param)
+            self.emit(f'if 0 <= {dst} < n and owned[{dst} >> {PAGE_BITS}]:')
+            self.emit(f'pages[{dst} >> {PAGE_BITS}][{dst} & {PAGE_MASK}] = {value}', 1)
+            self.emit('else:')
+            self.emit(f'mem[{dst}] = {value}', 1)
+            self.emit(f'n = len(pages) << {PAGE_BITS}', 1)
+        self.emit(f'if {dst} in code:')
+        self.emit(f'invalidate({dst})', 1)
+        self.emit(f'return {next_ip}, rb, k + {count}', 1)
+
+    def leave(self, next_ip, count):
+        self.emit(f'ip = {next_ip}')
+        self.emit(f'k += {count}')
+
+
+def compile_block(memory, address, volatile=frozenset()):
+    """
+    Translate the block starting at `address`. Returns the lines of its
+    source and the addresses it depends on, or None if there is nothing to
+    compile there.
+
+    Parameters in `volatile` cells (ones the program has written to) are
+    read from memory when the block runs instead of being compiled in, and
+    the block stops before an op code in a volatile cell.
+
+    The code runs inside the region function (see `region_source`): it
+    reads and updates `rb`, sets `ip` to where execution continues and adds
+    the number of instructions executed to `k`.
+    """
+    writer = _BlockWriter(len(memory.pages))
+    ip = address
+    count = 0
+    cells = []
+    while True:
+        if count == MAX_BLOCK_LENGTH or ip in volatile:
+            writer.leave(ip, count)
+            break
+        try:
+            op, m1, p1, m2, p2, m3, p3 = decode(memory, ip)
+        except (ValueError, IndexError):
+            # Not code (yet); let the interpreter deal with it if we get here
+            op = None
+        if op in (None, 3, 99):
+            writer.leave(ip, count)
+            break
+        count += 1
+        param_count = OP_CODES[op][1]
+        next_ip = ip + 1 + param_count
+        params = []
+        for i, param in enumerate((p1, p2, p3)[:param_count]):
+            address_ = ip + 1 + i
+            if address_ in volatile:
+                params.append((writer.cell(address_), False))
+            else:
+                params.append((param, True))
+                cells.append(address_)
+        cells.append(ip)
+
+        x = writer.read(m1, *params[0])
+        if op == 4:
+            writer.emit(f'put_output({x})')
+        elif op == 9:
+            writer.emit(f'rb += {x}')
+        else:
+            y = writer.read(m2, *params[1])
+            static = params[0][1] and params[1][1]
+            if op in (5, 6):
+                test = '!=' if op == 5 else '=='
+                if m1 == 1 and params[0][1]:
+                    # Constant condition: the jump is always or never taken
+                    taken = (p1 != 0) == (op == 5)
+                    writer.leave(y if taken else next_ip, count)
+                else:
+                    writer.emit(f'if {x} {test} 0:')
+                    writer.emit(f'ip = {y}', 1)
+                    writer.emit('else:')
+                    writer.emit(f'ip = {next_ip}', 1)
+                    writer.emit(f'k += {count}')
+                break
+            if m1 == 1 and m2 == 1 and static:
+                value = repr({
+                    1: p1 + p2, 2: p1 * p2, 7: int(p1 < p2), 8: int(p1 == p2),
+                }[op])
+            else:
+                operator = {1: '+', 2: '*', 7: '<', 8: '=='}[op]
+                value = f'{x} {operator} {y}'
+                if op in (7, 8):
+                    value = f'int({value})'
+            writer.emit(f'v = {value}')
+            writer.write(m3, *params[2], 'v', next_ip, count)
+        ip = next_ip
+    if count == 0:
+        return None
+    return writer.lines, cells
+
+
+def region_source(blocks):
+    """
+    Source of a factory for a region function running `blocks`, a list of
+    `(address, lines)` pairs in the order they should be tested.
+
+    The factory takes `(mem, pages, owned, code, put_output, invalidate)`
+    and returns `region(ip, rb)`, which runs compiled code until execution
+    leaves it and returns `(instruction_ptr, relative_base,
+    instructions_executed)`.
+    """
+    lines = [
+        'def make_region(mem, pages, owned, code, put_output, invalidate):',
+        '    def region(ip, rb):',
+        f'        n = len(pages) << {PAGE_BITS}',
+        '        k = 0',
+        '        while True:',
+    ]
+    for i, (address, block_lines) in enumerate(blocks):
+        lines.append(f'            {"if" if i == 0 else "elif"} ip == {address}:')
+        lines.extend(block_lines)
+    lines += [
+        '            else:',
+        '                return ip, rb, k',
+        '    return region',
+    ]
+    return '\n'.join(lines) + '\n'
+
+
+class JitProgram(Program):
+    """
+    A Program that compiles its hot basic blocks to Python and interprets
+    everything else. It behaves exactly like Program.
+    """
+
+    def __init__(self, memory_data, stdin=None, stdout=None):
+        super().__init__(memory_data, stdin, stdout)
+        self._forget_blocks()
+
+    def _forget_blocks(self):
+        # Block address -> source lines
+        self._blocks = {}
+        # Address -> addresses of the blocks depending on it
+        self._block_cells = {}
+        self._hits = {}
+        # Addresses written to while some block depended on them
+        self._volatile = set()
+        # Compiled blocks are grouped into regions like a binary counter:
+        # a new block gets a region of its own and regions of equal size
+        # are merged, so each block is only recompiled O(log n) times.
+        # _regions is a list of (block addresses, region function) and
+        # _region_of maps each compiled block address to its region.
+        self._regions = []
+        self._region_of = {}
+
+    def reset(self):
+        super().reset()
+        self._forget_blocks()
+
+    def fork(self, stdin=None, stdout=None):
+        res = super().fork(stdin, stdout)
+        res._forget_blocks()
+        res._blocks = self._blocks.copy()
+        res._block_cells = {k: v.copy() for k, v in self._block_cells.items()}
+        res._hits = self._hits.copy()
+        res._volatile = self._volatile.copy()
+        # Region functions are bound to a memory, so rebuild them for ours
+        for starts, _ in self._regions:
+            res._add_region(starts)
+        return res
+
+    def _add_region(self, starts):
+        make_region = _compile_region(
+            region_source([(start, self._blocks[start]) for start in starts])
+        )
+        region = make_region(
+            self._memory, self._memory.pages, self._memory.owned, self._code,
+            self._stdout.put_nowait, self._invalidate,
+        )
+        self._regions.append((starts, region))
+        for start in starts:
+            self._region_of[start] = region
+
+    def _remove_region(self, region):
+        for i, (starts, other) in enumerate(self._regions):
+            if other is region:
+                del self._regions[i]
+                for start in starts:
+                    del self._region_of[start]
+                return starts
+
+    def _invalidate(self, address):
+        super()._invalidate(address)
+        starts = self._block_cells.pop(address, ())
+        if not starts:
+            return
+        # Recompile the blocks later, reading this cell from memory
+        self._volatile.add(address)
+        for start in starts:
+            self._hits.pop(start, None)
+            if self._blocks.pop(start, None) is None:
+                continue
+            remaining = [
+                other for other in self._remove_region(self._region_of[start])
+                if other != start
+            ]
+            if remaining:
+                self._add_region(remaining)
+
+    def _compile(self, address):
+        if len(self._blocks) >= MAX_BLOCKS:
+            return
+        compiled = compile_block(self._memory, address, self._volatile)
+        if compiled is None:
+            return
+        lines, cells = compiled
+        self._blocks[address] = lines
+        for cell in cells:
+            self._block_cells.setdefault(cell, set()).add(address)
+        self._code.update(cells)
+
+        regions = self._regions
+        starts = [address]
+        while regions and len(regions[-1][0]) <= len(starts):
+            starts = self._remove_region(regions[-1][1]) + starts
+        self._add_region(starts)
+
+    def _execute(self, single_step):
+        if single_step:
+            return super()._execute(single_step)
+        region_of = self._region_of
+        hits = self._hits
+        interpret = super()._execute
+        self._waiting = False
+        while True:
+            ip = self._instruction_ptr
+            region = region_of.get(ip)
+            if region is not None:
+                ip, self._relative_base, count = region(ip, self._relative_base)
+                self._instruction_ptr = ip
+                self._instruction_count += count
+                continue
+            hit_count = hits.get(ip, 0) + 1
+            hits[ip] = hit_count
+            if hit_count == HOT_THRESHOLD:
+                self._compile(ip)
+                if ip in region_of:
+                    continue
+            if not interpret(single_step=True):
+                return False
@@ -0,0 +1,101 @@
+"""
+Parsing of comma separated Intcode programs.
+
+Programs are parsed a chunk at a time, so the text is never split into one
+big list of strings, and files are memory-mapped rather than read into a
+string. `load_image` also keeps the Images it loaded, keyed by a hash of
+the file contents, so loading the same program again costs one hash.
+"""
+from collections import OrderedDict
+import hashlib
+import itertools
+import mmap
+
+from .memory import Image
+
+# Characters parsed at a time
+CHUNK_SIZE = 1 << 20
+
+# Number of Images `load_image` keeps
+IMAGE_CACHE_SIZE = 16
+
+# File digest -> Image, least recently used first
+_image_cache = OrderedDict()
+
+
+def _parse_chunks(text, separator):
+    """
+    Yield lists of the values in `text` (a str, bytes or mmap), one list
+    per chunk of about CHUNK_SIZE characters.
+    """
+    start = 0
+    while start < len(text):
+        end = start + CHUNK_SIZE
+        if end < len(text):
+            # Don't split a value between chunks
+            end = text.find(separator, end)
+            if end == -1:
+                end = len(text)
+        chunk = text[start:end]
+        start = end + 1
+        if start > len(text) and not chunk.strip():
+            # Trailing whitespace after the last value
+            break
+        yield [int(i) for i in chunk.split(separator)]
+
+
+def parse_program(text):
+    """
+    Parse a comma separated Intcode program (a str, or bytes-like) into a
+    list of ints.
+    """
+    separator = ',' if isinstance(text, str) else b','
+    return list(itertools.chain.from_iterable(_parse_chunks(text, separator)))
+
+
+def _map_file(f):
+    # mmap can't map empty files
+    if not f.seek(0, 2):
+        return b''
+    return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def load_program(path):
+    """Parse the program in file `path` into a list of ints."""
+    with open(path, 'rb') as f:
+        text = _map_file(f)
+        try:
+            return parse_program(text)
+        finally:
+            if isinstance(text, mmap.mmap):
+                text.close()
+
+
+def load_image(path):
+    """
+    Load the program in file `path` as an Image. Images are cached by the
+    hash of the file contents, so loading an unchanged file again returns
+    the same Image.
+    """
+    with open(path, 'rb') as f:
+        text = _map_file(f)
+        try:
+            digest = hashlib.sha256(text).digest()
+            image = _image_cache.get(digest)
+            if image is None:
+                image = Image(itertools.chain.from_iterable(
+                    _parse_chunks(text, b',')
+                ))
+        finally:
+            if isinstance(text, mmap.mmap):
+                text.close()
+
+    _image_cache[digest] = image
+    _image_cache.move_to_end(digest)
+    while len(_image_cache) > IMAGE_CACHE_SIZE:
+        _image_cache.popitem(last=False)
+    return image
+
+
+def clear_image_cache():
+    _image_cache.clear()
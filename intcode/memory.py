@@ -0,0 +1,124 @@
+import itertools
+
+# Memory is split into pages of PAGE_SIZE cells. Pages are shared between
+# every Memory created from the same Image (and between forks) until one of
+# them writes to the page, at which point the writer gets a private copy.
+PAGE_BITS = 8
+PAGE_SIZE = 1 << PAGE_BITS
+PAGE_MASK = PAGE_SIZE - 1
+
+# Addresses below this are stored in pages that are allocated on demand.
+# Writes above it go to a sparse dict so a stray high address doesn't make
+# us allocate gigabytes of zeros.
+DENSE_LIMIT = 1 << 20
+
+# Shared, never written, stand-in for pages nobody has written to yet
+_ZERO_PAGE = [0] * PAGE_SIZE
+
+
+class Image:
+    """An immutable program image that any number of Memory objects share."""
+
+    __slots__ = ('pages', 'size')
+
+    def __init__(self, data):
+        # Build the pages straight from `data`, which may be an iterator,
+        # without copying all of it into one list first
+        data = iter(data)
+        pages = []
+        size = 0
+        while True:
+            page = list(itertools.islice(data, PAGE_SIZE))
+            size += len(page)
+            if len(page) < PAGE_SIZE:
+                break
+            pages.append(page)
+        if page:
+            page.extend([0] * (PAGE_SIZE - len(page)))
+            pages.append(page)
+        self.size = size
+        self.pages = tuple(pages)
+
+    def __len__(self):
+        return self.size
+
+    def tolist(self):
+        return [value for page in self.pages for value in page][:self.size]
+
+
+class Memory:
+    """
+    Copy-on-write Intcode memory. Unwritten addresses read as zero.
+
+    `pages` is a list of page lists and `owned` a bytearray saying which of
+    them this Memory may write to in place. The execution loop indexes the
+    pages directly and only goes through `__getitem__`/`__setitem__` for
+    addresses outside them or writes to pages it doesn't own yet.
+    """
+
+    __slots__ = ('pages', 'owned', 'sparse', '_image')
+
+    def __init__(self, data):
+        if not isinstance(data, Image):
+            data = Image(data)
+        self._image = data
+        self.pages = list(data.pages)
+        self.owned = bytearray(len(self.pages))
+        self.sparse = {}
+
+    @property
+    def image(self):
+        return self._image
+
+    def __len__(self):
+        return len(self.pages) << PAGE_BITS
+
+    def __getitem__(self, address):
+        if address < 0:
+            raise IndexError(f"Invalid memory address: {address}")
+        try:
+            return self.pages[address >> PAGE_BITS][address & PAGE_MASK]
+        except IndexError:
+            return self.sparse.get(address, 0)
+
+    def __setitem__(self, address, value):
+        if address < 0:
+            raise IndexError(f"Invalid memory address: {address}")
+        index = address >> PAGE_BITS
+        pages = self.pages
+        if index >= len(pages):
+            if address >= DENSE_LIMIT:
+                self.sparse[address] = value
+                return
+            new_pages = index + 1 - len(pages)
+            pages.extend([_ZERO_PAGE] * new_pages)
+            self.owned.extend(bytes(new_pages))
+        if not self.owned[index]:
+            pages[index] = pages[index].copy()
+            self.owned[index] = 1
+        pages[index][address & PAGE_MASK] = value
+
+    def owned_pages(self):
+        """Number of pages this Memory has written to (and so copied)."""
+        return sum(self.owned)
+
+    def fork(self):
+        """
+        Return a copy of this memory. Both copies share all pages until they
+        write to them.
+        """
+        res = Memory.__new__(Memory)
+        res._image = self._image
+        res.pages = self.pages.copy()
+        res.owned = bytearray(len(self.owned))
+        res.sparse = self.sparse.copy()
+        # Our pages are now shared with the fork, so we must copy them too
+        # before writing. Modify in place as a running VM holds references.
+        self.owned[:] = res.owned
+        return res
+
+    def reset(self):
+        """Restore the memory to the image it was created from."""
+        self.pages[:] = self._image.pages
+        self.owned[:] = bytes(len(self.pages))
+        self.sparse.clear()
@@ -0,0 +1,254 @@
+"""
+Opt-in instrumentation for Intcode runs.
+
+ProfiledProgram is a Program with its own, instrumented, execution loop,
+so plain Programs pay nothing for it. It records into a Profile:
+
+- executed instructions, in total and per op code
+- how many times each address was executed
+- how often each conditional jump was taken
+- the highest address read or written
+- additions and multiplications whose result doesn't fit in 64 bits
+- input reads, output writes and how many times the program stopped to
+  wait for input
+
+A Profile exports to JSON and to the folded-stack format read by
+flamegraph.pl and speedscope. To profile a program from the command line:
+
+    python -m intcode.profiler [--input N] [--json FILE] [--folded FILE]
+        [--top N] path/to/input.txt
+
+`--input` may be given several times, once per input value.
+"""
+import argparse
+from collections import Counter
+from queue import Empty
+import json
+
+from .vm import INT64_MAX, INT64_MIN, OP_CODES, Program
+
+
+class Profile:
+    """Counters collected while running a ProfiledProgram."""
+
+    def __init__(self):
+        self.instructions = 0
+        self.op_codes = Counter()
+        self.address_hits = Counter()
+        # Jump address -> [times taken, times executed]
+        self.branches = {}
+        self.memory_high_water = -1
+        self.overflows = 0
+        self.inputs = 0
+        self.outputs = 0
+        self.input_waits = 0
+        # Address -> op code last executed there, for the folded stacks.
+        # Self-modifying code can run different op codes at one address.
+        self._op_at = {}
+
+    def branch_ratios(self):
+        """Return {jump address: fraction of executions that jumped}."""
+        return {
+            address: taken / executed
+            for address, (taken, executed) in sorted(self.branches.items())
+        }
+
+    def to_dict(self):
+        return {
+            'instructions': self.instructions,
+            'op_codes': {
+                OP_CODES[op][0]: count
+                for op, count in self.op_codes.most_common()
+            },
+            'address_hits': {
+                str(address): count
+                for address, count in sorted(self.address_hits.items())
+            },
+            'branches': {
+                str(address): {
+                    'taken': taken,
+                    'executed': executed,
+                    'ratio': taken / executed,
+                }
+                for address, (taken, executed) in sorted(self.branches.items())
+            },
+            'memory_high_water': self.memory_high_water,
+            'overflows': self.overflows,
+            'io': {
+                'inputs': self.inputs,
+                'outputs': self.outputs,
+                'input_waits': self.input_waits,
+            },
+        }
+
+    def to_json(self, **kwargs):
+        return json.dumps(self.to_dict(), **kwargs)
+
+    def folded_stacks(self, root='intcode'):
+        """
+        Return the address hit counts as folded stacks, one
+        `root;op_name;address count` line per executed address.
+        """
+        return ''.join(
+            f"{root};{OP_CODES[self._op_at[address]][0]};{address} {count}\n"
+            for address, count in sorted(self.address_hits.items())
+        )
+
+    def save_json(self, path):
+        with open(path, 'w') as f:
+            f.write(self.to_json(indent=2))
+
+    def save_folded(self, path, root='intcode'):
+        with open(path, 'w') as f:
+            f.write(self.folded_stacks(root))
+
+    def _record(self, address, op):
+        self._op_at[address] = op
+        self.address_hits[address] += 1
+        self.op_codes[op] += 1
+        self.instructions += 1
+
+    def _touch(self, address):
+        if address > self.memory_high_water:
+            self.memory_high_water = address
+
+
+class ProfiledProgram(Program):
+    """
+    A Program that records a Profile of everything it executes.
+
+    The profile covers the program's whole life, including runs before a
+    `reset`. Forks start with an empty profile.
+    """
+
+    def __init__(self, memory_data, stdin=None, stdout=None):
+        super().__init__(memory_data, stdin, stdout)
+        self.profile = Profile()
+
+    def fork(self, stdin=None, stdout=None):
+        res = super().fork(stdin, stdout)
+        res.profile = Profile()
+        return res
+
+    def _execute(self, single_step):
+        mem = self._memory
+        profile = self.profile
+        record = profile._record
+        touch = profile._touch
+        branches = profile.branches
+        decoded = self._decoded
+        self._waiting = False
+
+        def load(mode, param):
+            if mode == 1:
+                return param
+            address = param if mode == 0 else self._relative_base + param
+            touch(address)
+            return mem[address]
+
+        while True:
+            ip = self._instruction_ptr
+            instruction = decoded.get(ip)
+            if instruction is None:
+                instruction = self._decode(ip)
+            op, m1, p1, m2, p2, m3, p3 = instruction
+
+            if op == 99:
+                # Like Program, halting doesn't count as an instruction
+                self._halted = True
+                return False
+
+            dst = None
+            if op == 3:
+                try:
+                    value = self._stdin.get_nowait()
+                except Empty:
+                    profile.input_waits += 1
+                    self._waiting = True
+                    return False
+                profile.inputs += 1
+                dst = p1 if m1 == 0 else self._relative_base + p1
+                next_ip = ip + 2
+            elif op == 4:
+                self._stdout.put_nowait(load(m1, p1))
+                profile.outputs += 1
+                next_ip = ip + 2
+            elif op == 9:
+                self._relative_base += load(m1, p1)
+                next_ip = ip + 2
+            elif op in (5, 6):
+                x = load(m1, p1)
+                y = load(m2, p2)
+                taken = (x != 0) if op == 5 else (x == 0)
+                counts = branches.setdefault(ip, [0, 0])
+                counts[0] += taken
+                counts[1] += 1
+                next_ip = y if taken else ip + 3
+            else:
+                x = load(m1, p1)
+                y = load(m2, p2)
+                if op in (1, 2):
+                    value = x + y if op == 1 else x * y
+                    if not INT64_MIN <= value <= INT64_MAX:
+                        profile.overflows += 1
+                elif op == 7:
+                    value = int(x < y)
+                else:
+                    value = int(x == y)
+                dst = p3 if m3 == 0 else self._relative_base + p3
+                next_ip = ip + 4
+
+            record(ip, op)
+            self._instruction_ptr = next_ip
+            self._instruction_count += 1
+            if dst is not None:
+                touch(dst)
+                self.write(dst, value)
+            if single_step:
+                return True
+
+
+def main():
+    from .loader import load_program
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('input_file')
+    parser.add_argument('--input', type=int, action='append', default=[],
+                        help="input value (repeat for several)")
+    parser.add_argument('--json', metavar='FILE')
+    parser.add_argument('--folded', metavar='FILE')
+    parser.add_argument('--top', type=int, default=10,
+                        help="number of hottest addresses to print")
+    args = parser.parse_args()
+
+    program = ProfiledProgram(load_program(args.input_file))
+    program.feed(*args.input)
+    program.run()
+    profile = program.profile
+
+    print(f"output: {program.drain()}")
+    print(f"instructions: {profile.instructions}")
+    for name, count in profile.to_dict()['op_codes'].items():
+        print(f"  {name:<22}{count:>12}")
+    print(f"memory high water: {profile.memory_high_water}")
+    print(f"64-bit overflows: {profile.overflows}")
+    print(
+        f"inputs: {profile.inputs}, outputs: {profile.outputs}, "
+        f"input waits: {profile.input_waits}"
+    )
+    print("hottest addresses:")
+    for address, count in profile.address_hits.most_common(args.top):
+        ratio = ''
+        if address in profile.branches:
+            taken, executed = profile.branches[address]
+            ratio = f"  (taken {taken / executed:.0%})"
+        print(f"  {address:>8}{count:>12}{ratio}")
+
+    if args.json:
+        profile.save_json(args.json)
+    if args.folded:
+        profile.save_folded(args.folded)
+
+
+if __name__ == '__main__':
+    main()
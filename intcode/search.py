@@ -0,0 +1,281 @@
+"""
+Parallel search over inputs to an Intcode program.
+
+The program image is shipped to each worker process once, when the worker
+starts, and only candidates and results travel between processes after
+that. Evaluation functions must be defined at module level so they can be
+pickled. The process pool and asyncio are only imported when used, as
+importing them takes longer than solving most inputs.
+"""
+from fractions import Fraction
+import functools
+import itertools
+import math
+import os
+
+from .channels import Channel
+from .memory import Image
+from .symbolic import Linear, NotSymbolic, run_symbolic
+from .vm import Program, run_program
+
+# Feedback loops of up to this many amplifiers are run round-robin in this
+# process; longer ones on an asyncio Network, which only wakes programs that
+# have input rather than visiting every one of them
+MAX_ROUND_ROBIN = 16
+
+# With the default number of workers, searches over fewer candidates than
+# this stay in this process: starting a process pool costs more than
+# running a few hundred small programs
+MIN_POOL_CANDIDATES = 1000
+
+# The program image in a worker process, set by _init_worker
+_worker_image = None
+
+
+def _init_worker(image):
+    global _worker_image
+    _worker_image = image
+
+
+def _evaluate_in_worker(evaluate, candidate):
+    return candidate, evaluate(_worker_image, candidate)
+
+
+def _default_workers(workers, candidates):
+    """
+    Return (number of worker processes, candidates as a list). Without an
+    explicit `workers`, that's one per CPU for large searches, one for small.
+    """
+    candidates = list(candidates)
+    if workers is None:
+        if len(candidates) < MIN_POOL_CANDIDATES:
+            workers = 1
+        else:
+            workers = os.cpu_count() or 1
+    return workers, candidates
+
+
+def _best(results, key):
+    best = None
+    for candidate, result in results:
+        if best is None or key(result) > key(best[1]):
+            best = (candidate, result)
+    if best is None:
+        raise ValueError("No candidates to search")
+    return best
+
+
+def search(evaluate, memory_data, candidates, workers=None, chunksize=None,
+           key=lambda result: result):
+    """
+    Call `evaluate(image, candidate)` for every candidate and return the
+    `(candidate, result)` pair with the largest `key(result)`.
+
+    The candidates are spread over `workers` processes (default: one per
+    CPU, or just this process for fewer than MIN_POOL_CANDIDATES
+    candidates). With a single worker everything runs in this process.
+    """
+    image = memory_data if isinstance(memory_data, Image) else Image(memory_data)
+    workers, candidates = _default_workers(workers, candidates)
+    if workers == 1:
+        return _best(((c, evaluate(image, c)) for c in candidates), key)
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    if chunksize is None:
+        # A few chunks per worker evens out candidates that take longer
+        # than others without paying for a round trip per candidate.
+        chunksize = max(1, len(candidates) // (4 * workers))
+    with ProcessPoolExecutor(
+        workers, initializer=_init_worker, initargs=(image,)
+    ) as executor:
+        results = executor.map(
+            functools.partial(_evaluate_in_worker, evaluate),
+            candidates,
+            chunksize=chunksize,
+        )
+        return _best(results, key)
+
+
+def first(evaluate, memory_data, candidates, workers=None, chunksize=None):
+    """
+    Return the first `(candidate, result)`, in candidate order, for which
+    `evaluate(image, candidate)` isn't None, or None if there is none.
+
+    Like `search` this spreads candidates over `workers` processes. Work
+    that hasn't started yet is cancelled as soon as a match is found.
+    """
+    image = memory_data if isinstance(memory_data, Image) else Image(memory_data)
+    workers, candidates = _default_workers(workers, candidates)
+    if workers == 1:
+        for candidate in candidates:
+            result = evaluate(image, candidate)
+            if result is not None:
+                return candidate, result
+        return None
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    if chunksize is None:
+        chunksize = max(1, len(candidates) // (4 * workers))
+    executor = ProcessPoolExecutor(
+        workers, initializer=_init_worker, initargs=(image,)
+    )
+    try:
+        results = executor.map(
+            functools.partial(_evaluate_in_worker, evaluate),
+            candidates,
+            chunksize=chunksize,
+        )
+        for candidate, result in results:
+            if result is not None:
+                return candidate, result
+        return None
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+
+def amplifier_chain(image, phase_settings):
+    """Output of amplifiers run one after another (day 7 part 1)."""
+    signal = 0
+    for phase_setting in phase_settings:
+        signal, = run_program(image, [phase_setting, signal])
+    return signal
+
+
+def amplifier_loop(image, phase_settings):
+    """Output of amplifiers connected in a feedback loop (day 7 part 2)."""
+    inputs = [[phase_setting] for phase_setting in phase_settings]
+    inputs[0].append(0)
+    if len(inputs) > MAX_ROUND_ROBIN:
+        return _network_loop(image, inputs)
+
+    channels = [Channel(values) for values in inputs]
+    programs = [
+        Program(image, channel, channels[(i + 1) % len(channels)])
+        for i, channel in enumerate(channels)
+    ]
+    while True:
+        ran = False
+        for program in programs:
+            if program.halted() or (program.waiting() and not program.stdin):
+                continue
+            program.run()
+            ran = True
+        if not ran:
+            break
+    if not all(program.halted() for program in programs):
+        raise RuntimeError("Amplifiers are waiting for input nobody will send")
+    return channels[0].get()
+
+
+def _network_loop(image, inputs):
+    import asyncio
+
+    from .aio import Network
+
+    network = Network()
+    channels = network.ring(image, inputs)
+    asyncio.run(network.run())
+    return channels[0].get()
+
+
+def search_amplifiers(memory_data, phases, count=None, feedback=False,
+                      workers=None):
+    """
+    Find the ordering of `count` (default: all) of `phases` that gives the
+    highest amplifier output. Returns `(phase_settings, output)`.
+    """
+    evaluate = amplifier_loop if feedback else amplifier_chain
+    candidates = itertools.permutations(phases, count)
+    return search(evaluate, memory_data, candidates, workers=workers)
+
+
+def noun_verb_output(image, noun, verb):
+    """Memory[0] after running with `noun` and `verb` in cells 1 and 2 (day 2)."""
+    program = Program(image)
+    program.write(1, noun)
+    program.write(2, verb)
+    program.run()
+    return program.read(0)
+
+
+def _find_verb(image, noun, verbs, target):
+    for verb in verbs:
+        if noun_verb_output(image, noun, verb) == target:
+            return verb
+    return None
+
+
+def _solve_linear(a, b, c, target, xs, ys):
+    """
+    Smallest `(x, y)` with `x` in range `xs` and `y` in range `ys` such that
+    `a*x + b*y + c == target`, or None. Both ranges must have step 1.
+    """
+    rhs = target - c
+    if not xs or not ys:
+        return None
+    if b == 0:
+        if a == 0:
+            return (xs[0], ys[0]) if rhs == 0 else None
+        x, remainder = divmod(rhs, a)
+        return (x, ys[0]) if not remainder and x in xs else None
+
+    # a*x + b*y = rhs has solutions x = x0 + k*period for integer k
+    g = math.gcd(a, b)
+    if rhs % g:
+        return None
+    period = abs(b // g)
+    x0 = (rhs // g) * pow(a // g, -1, period) % period if period > 1 else 0
+
+    # Range of x that keeps y = (rhs - a*x) / b inside ys
+    if a == 0:
+        x_min, x_max = xs[0], xs[-1]
+    else:
+        bounds = [Fraction(rhs - b * y, a) for y in (ys[0], ys[-1])]
+        x_min = max(xs[0], math.ceil(min(bounds)))
+        x_max = min(xs[-1], math.floor(max(bounds)))
+    x = x_min + (x0 - x_min) % period
+    if x > x_max:
+        return None
+    y = (rhs - a * x) // b
+    return (x, y) if y in ys else None
+
+
+def solve_noun_verb(memory_data, target, nouns=range(100), verbs=range(100),
+                    symbolic=True, workers=None):
+    """
+    Find the first `(noun, verb)` (ordered by noun, then verb) for which
+    the day 2 program leaves `target` in memory[0], or None.
+
+    With `symbolic` the program is first run once with the noun and verb as
+    variables. If memory[0] comes out as a linear expression in them the
+    answer is solved for directly, which works for ranges of any size.
+    Otherwise, or when `nouns` and `verbs` aren't both ranges with step 1,
+    every pair is tried, one noun per task, across `workers` processes.
+    """
+    image = memory_data if isinstance(memory_data, Image) else Image(memory_data)
+    contiguous = all(
+        isinstance(values, range) and values.step == 1
+        for values in (nouns, verbs)
+    )
+    if symbolic and contiguous:
+        try:
+            output = run_symbolic(image.tolist(), {1: 'noun', 2: 'verb'})[0]
+        except NotSymbolic:
+            pass
+        else:
+            if isinstance(output, int):
+                output = Linear(output)
+            if isinstance(output, Linear):
+                res = _solve_linear(
+                    output['noun'], output['verb'], output.const,
+                    target, nouns, verbs,
+                )
+                # Cheap check that the symbolic run matches a real one,
+                # falling back to trying every pair if it doesn't
+                if res is None or noun_verb_output(image, *res) == target:
+                    return res
+
+    evaluate = functools.partial(_find_verb, verbs=verbs, target=target)
+    return first(evaluate, image, nouns, workers=workers)
@@ -0,0 +1,123 @@
+"""
+Binary snapshots of Intcode program state.
+
+A snapshot holds the instruction pointer, relative base, run flags, every
+allocated memory page, the sparse high memory and any pending input and
+output. Layout (all integers in the byte order recorded in the header):
+
+    header  HEADER struct, see below
+    body    int64 array (or comma separated ASCII if some value doesn't
+            fit in 64 bits) of: memory cells, sparse addresses, sparse
+            values, pending input, pending output
+
+Snapshots restore into Programs whose memory is a fresh Image built from
+the snapshot, so many Programs restored from one snapshot share its pages
+copy-on-write.
+"""
+from array import array
+import mmap
+import struct
+import sys
+
+MAGIC = b'ICVM'
+VERSION = 1
+
+# magic, version, byte order, flags, body encoding, instruction pointer,
+# relative base, cell count, sparse count, input count, output count
+HEADER = struct.Struct('<4sBBBBqqQQQQ')
+
+FLAG_HALTED = 1
+FLAG_WAITING = 2
+
+ENCODING_INT64 = 0
+ENCODING_TEXT = 1
+
+_BYTE_ORDERS = {'little': 0, 'big': 1}
+
+
+def pack(instruction_ptr, relative_base, halted, waiting, cells, sparse,
+         stdin, stdout):
+    """Serialize program state into snapshot bytes."""
+    values = list(cells)
+    values += sparse.keys()
+    values += sparse.values()
+    values += stdin
+    values += stdout
+    try:
+        body = array('q', values).tobytes()
+        encoding = ENCODING_INT64
+    except OverflowError:
+        body = ','.join(map(str, values)).encode('ascii')
+        encoding = ENCODING_TEXT
+    flags = FLAG_HALTED * bool(halted) | FLAG_WAITING * bool(waiting)
+    header = HEADER.pack(
+        MAGIC, VERSION, _BYTE_ORDERS[sys.byteorder], flags, encoding,
+        instruction_ptr, relative_base,
+        len(cells), len(sparse), len(stdin), len(stdout),
+    )
+    return header + body
+
+
+def unpack(buffer):
+    """
+    Parse snapshot bytes (or any buffer, e.g. an mmap) into a dict of
+    program state, the inverse of `pack`.
+    """
+    (magic, version, byte_order, flags, encoding, instruction_ptr,
+     relative_base, cell_count, sparse_count, input_count,
+     output_count) = HEADER.unpack_from(buffer)
+    if magic != MAGIC:
+        raise ValueError("Not an Intcode snapshot")
+    if version != VERSION:
+        raise ValueError(f"Unsupported snapshot version: {version}")
+
+    body = memoryview(buffer)[HEADER.size:]
+    if encoding == ENCODING_INT64:
+        if byte_order == _BYTE_ORDERS[sys.byteorder]:
+            values = body.cast('q')
+        else:
+            values = array('q', body)
+            values.byteswap()
+    elif encoding == ENCODING_TEXT:
+        values = [int(i) for i in bytes(body).split(b',')] if body else []
+    else:
+        raise ValueError(f"Unknown snapshot encoding: {encoding}")
+
+    parts = []
+    start = 0
+    for count in (cell_count, sparse_count, sparse_count, input_count,
+                  output_count):
+        part = values[start:start + count]
+        parts.append(part if isinstance(part, list) else part.tolist())
+        start += count
+    if isinstance(values, memoryview):
+        values.release()
+    body.release()
+    cells, sparse_keys, sparse_values, stdin, stdout = parts
+    return {
+        'instruction_ptr': instruction_ptr,
+        'relative_base': relative_base,
+        'halted': bool(flags & FLAG_HALTED),
+        'waiting': bool(flags & FLAG_WAITING),
+        'cells': cells,
+        'sparse': dict(zip(sparse_keys, sparse_values)),
+        'stdin': stdin,
+        'stdout': stdout,
+    }
+
+
+def save(program, path):
+    """Write a snapshot of `program` to `path`."""
+    with open(path, 'wb') as f:
+        f.write(program.snapshot())
+
+
+def load(path, stdin=None, stdout=None):
+    """Restore a Program from a snapshot file, memory-mapping the file."""
+    # Imported here as vm imports this module
+    from .vm import Program
+
+    with open(path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            state = unpack(mm)
+    return Program.from_state(state, stdin, stdout)
@@ -0,0 +1,143 @@
+"""
+Symbolic execution of Intcode programs over linear expressions.
+
+Some memory cells are replaced by variables and the program is run with
+values being `Linear` expressions in those variables. This only works for
+programs whose control flow and write addresses don't depend on the
+variables; anything else raises NotSymbolic. Reading through a symbolic
+address or multiplying two variables gives UNKNOWN, which is fine as long
+as the value is overwritten or never used for anything that matters.
+"""
+from .vm import decode
+
+
+class NotSymbolic(Exception):
+    """The program does something that can't be followed symbolically."""
+
+
+class _Unknown:
+    """A value that depends on the variables in a non-linear way."""
+
+    def __repr__(self):
+        return 'UNKNOWN'
+
+    def __add__(self, other):
+        return self
+
+    __radd__ = __mul__ = __rmul__ = __add__
+
+
+UNKNOWN = _Unknown()
+
+
+class Linear:
+    """The expression `const + sum(coeff * variable for coeffs.items())`."""
+
+    __slots__ = ('const', 'coeffs')
+
+    def __init__(self, const=0, coeffs=None):
+        self.const = const
+        self.coeffs = {k: v for k, v in (coeffs or {}).items() if v}
+
+    @classmethod
+    def variable(cls, name):
+        return cls(0, {name: 1})
+
+    def __repr__(self):
+        terms = [f"{coeff}*{name}" for name, coeff in self.coeffs.items()]
+        return ' + '.join(terms + [str(self.const)])
+
+    def __getitem__(self, name):
+        return self.coeffs.get(name, 0)
+
+    def __add__(self, other):
+        if isinstance(other, Linear):
+            coeffs = dict(self.coeffs)
+            for name, coeff in other.coeffs.items():
+                coeffs[name] = coeffs.get(name, 0) + coeff
+            return _simplify(Linear(self.const + other.const, coeffs))
+        if isinstance(other, int):
+            return Linear(self.const + other, self.coeffs)
+        return NotImplemented
+
+    __radd__ = __add__
+
+    def __mul__(self, other):
+        if isinstance(other, Linear):
+            return UNKNOWN
+        if not isinstance(other, int):
+            return NotImplemented
+        return _simplify(Linear(
+            self.const * other,
+            {name: coeff * other for name, coeff in self.coeffs.items()},
+        ))
+
+    __rmul__ = __mul__
+
+
+def _simplify(value):
+    return value if value.coeffs else value.const
+
+
+def _concrete(value, what):
+    if not isinstance(value, int):
+        raise NotSymbolic(f"Symbolic {what}: {value}")
+    return value
+
+
+def run_symbolic(memory_data, variables):
+    """
+    Run a program with the cells in `variables` (address -> name) replaced
+    by variables and return its final memory, a list of ints, Linears and
+    UNKNOWNs.
+    """
+    memory = list(memory_data)
+    for address, name in variables.items():
+        memory[address] = Linear.variable(name)
+
+    def address_of(mode, param):
+        address = _concrete(param if mode == 0 else rb + param, "address")
+        if address < 0:
+            raise IndexError(f"Invalid memory address: {address}")
+        if address >= len(memory):
+            memory.extend([0] * (address + 1 - len(memory)))
+        return address
+
+    def value_of(mode, param):
+        if mode == 1:
+            return param
+        if not isinstance(param if mode == 0 else rb + param, int):
+            return UNKNOWN
+        return memory[address_of(mode, param)]
+
+    ip = 0
+    rb = 0
+    while True:
+        _concrete(memory[ip], "instruction")
+        op, m1, p1, m2, p2, m3, p3 = decode(memory, ip)
+        if op == 99:
+            return memory
+        elif op in (3, 4):
+            raise NotSymbolic("Input and output are not supported")
+        elif op == 9:
+            rb += _concrete(value_of(m1, p1), "relative base")
+            ip += 2
+        elif op in (5, 6):
+            condition = _concrete(value_of(m1, p1), "condition")
+            if (condition != 0) == (op == 5):
+                ip = _concrete(value_of(m2, p2), "jump target")
+            else:
+                ip += 3
+        else:
+            x = value_of(m1, p1)
+            y = value_of(m2, p2)
+            if op == 1:
+                value = x + y
+            elif op == 2:
+                value = x * y
+            elif op == 7:
+                value = int(_concrete(x, "comparison") < _concrete(y, "comparison"))
+            else:
+                value = int(_concrete(x, "comparison") == _concrete(y, "comparison"))
+            memory[address_of(m3, p3)] = value
+            ip += 4
@@ -0,0 +1,315 @@
+from queue import Empty
+import itertools
+
+from . import snapshot
+from .channels import Channel
+from .memory import PAGE_BITS, PAGE_MASK, Image, Memory
+
+
+# op_code: (name, param_count)
+OP_CODES = {
+    1: ('add', 3),
+    2: ('mul', 3),
+    3: ('input', 1),
+    4: ('output', 1),
+    5: ('jump_if_true', 2),
+    6: ('jump_if_false', 2),
+    7: ('less_than', 3),
+    8: ('equals', 3),
+    9: ('relative_base_offset', 1),
+    99: ('halt', 0),
+}
+
+# Op codes whose last parameter is an address that gets written to
+WRITING_OP_CODES = {1, 2, 3, 7, 8}
+
+POSITION_MODE = 0
+IMMEDIATE_MODE = 1
+RELATIVE_MODE = 2
+
+# Values are Python ints and never overflow, but programs whose values stay
+# in this range can run on int64 machinery (see intcode.batch)
+INT64_MIN = -2**63
+INT64_MAX = 2**63 - 1
+
+
+def decode(memory, address):
+    """
+    Decode the instruction at `address`.
+
+    The result is a flat tuple `(op_code, mode1, param1, mode2, param2,
+    mode3, param3)` where unused parameter slots are zero, so the execution
+    loop can unpack every instruction the same way.
+    """
+    param_modes, op_code = divmod(memory[address], 100)
+    try:
+        _, param_count = OP_CODES[op_code]
+    except KeyError:
+        raise ValueError(f"Unknown op code {op_code} at {address}") from None
+    res = [op_code]
+    for i in range(3):
+        param_modes, mode = divmod(param_modes, 10)
+        if i >= param_count:
+            res += (0, 0)
+            continue
+        if mode not in (POSITION_MODE, IMMEDIATE_MODE, RELATIVE_MODE):
+            raise ValueError(f"Invalid parameter mode {mode} at {address}")
+        if (mode == IMMEDIATE_MODE and i == param_count - 1
+                and op_code in WRITING_OP_CODES):
+            raise ValueError(f"Immediate mode output parameter at {address}")
+        res += (mode, memory[address + 1 + i])
+    return tuple(res)
+
+
+class Program:
+    """
+    An Intcode program loaded into its own memory.
+
+    Input is read from `stdin` and output written to `stdout`, both channels
+    (see `intcode.channels`). When no channels are given the program creates
+    its own single-threaded ones, which can be used through `feed` and
+    `drain`.
+
+    `memory_data` is either a sequence of ints or an `Image`. Programs
+    created from the same Image share its memory pages until they write to
+    them, so spawning many programs from one Image is cheap.
+    """
+
+    def __init__(self, memory_data, stdin=None, stdout=None):
+        self._memory = Memory(memory_data)
+        self._instruction_ptr = 0
+        self._relative_base = 0
+        self._stdin = Channel() if stdin is None else stdin
+        self._stdout = Channel() if stdout is None else stdout
+        self._halted = False
+        self._waiting = False
+        self._instruction_count = 0
+        # Decode cache: address -> decoded instruction, and the set of
+        # addresses covered by decoded instructions. Writes to a covered
+        # address invalidate the cached instructions around it.
+        self._decoded = {}
+        self._code = set()
+
+    @property
+    def stdin(self):
+        return self._stdin
+
+    @property
+    def stdout(self):
+        return self._stdout
+
+    def halted(self):
+        return self._halted
+
+    def waiting(self):
+        """True if the last run stopped because stdin was empty."""
+        return self._waiting
+
+    def instruction_count(self):
+        """Number of instructions executed so far."""
+        return self._instruction_count
+
+    def reset(self):
+        """Return to the freshly loaded state. Pending I/O is left alone."""
+        self._memory.reset()
+        self._instruction_ptr = 0
+        self._relative_base = 0
+        self._halted = False
+        self._waiting = False
+        self._instruction_count = 0
+        self._decoded = {}
+        self._code = set()
+
+    def fork(self, stdin=None, stdout=None):
+        """
+        Return an independent copy of this program in its current state.
+
+        The copy shares memory pages with this program until either of them
+        writes to them. Pending input and output are not copied; the fork
+        gets the given channels, or new empty ones.
+        """
+        res = type(self).__new__(type(self))
+        res._memory = self._memory.fork()
+        res._instruction_ptr = self._instruction_ptr
+        res._relative_base = self._relative_base
+        res._stdin = Channel() if stdin is None else stdin
+        res._stdout = Channel() if stdout is None else stdout
+        res._halted = self._halted
+        res._waiting = self._waiting
+        res._instruction_count = self._instruction_count
+        res._decoded = self._decoded.copy()
+        res._code = self._code.copy()
+        return res
+
+    def snapshot(self):
+        """
+        Return the complete state of the program, including pending input
+        and output, as compact bytes. See `intcode.snapshot` for the format.
+        """
+        return snapshot.pack(
+            self._instruction_ptr,
+            self._relative_base,
+            self._halted,
+            self._waiting,
+            list(itertools.chain.from_iterable(self._memory.pages)),
+            self._memory.sparse,
+            self._stdin.peek(),
+            self._stdout.peek(),
+        )
+
+    @classmethod
+    def restore(cls, data, stdin=None, stdout=None):
+        """Create a program from bytes returned by `snapshot`."""
+        return cls.from_state(snapshot.unpack(data), stdin, stdout)
+
+    @classmethod
+    def from_state(cls, state, stdin=None, stdout=None):
+        res = cls(Image(state['cells']), stdin, stdout)
+        res._memory.sparse.update(state['sparse'])
+        res._instruction_ptr = state['instruction_ptr']
+        res._relative_base = state['relative_base']
+        res._halted = state['halted']
+        res._waiting = state['waiting']
+        res._stdin.put_many(state['stdin'])
+        res._stdout.put_many(state['stdout'])
+        return res
+
+    def feed(self, *values):
+        self._stdin.put_many(values)
+
+    def drain(self):
+        """Remove and return everything currently in stdout."""
+        return self._stdout.drain()
+
+    def read(self, address):
+        return self._memory[address]
+
+    def write(self, address, value):
+        self._memory[address] = value
+        if address in self._code:
+            self._invalidate(address)
+
+    def _decode(self, address):
+        instruction = decode(self._memory, address)
+        self._decoded[address] = instruction
+        param_count = OP_CODES[instruction[0]][1]
+        self._code.update(range(address, address + 1 + param_count))
+        return instruction
+
+    def _invalidate(self, address):
+        """Forget decoded instructions that may include `address`."""
+        for start in range(address - 3, address + 1):
+            self._decoded.pop(start, None)
+
+    def _execute(self, single_step):
+        mem = self._memory
+        pages = mem.pages
+        owned = mem.owned
+        shift = PAGE_BITS
+        mask = PAGE_MASK
+        n = len(pages) << shift
+        decoded = self._decoded
+        code = self._code
+        get_input = self._stdin.get_nowait
+        put_output = self._stdout.put_nowait
+        ip = self._instruction_ptr
+        rb = self._relative_base
+        count = 0
+        self._waiting = False
+        try:
+            while True:
+                instruction = decoded.get(ip)
+                if instruction is None:
+                    instruction = self._decode(ip)
+                op, m1, p1, m2, p2, m3, p3 = instruction
+
+                if op == 99:
+                    self._halted = True
+                    return False
+
+                if op == 3:
+                    try:
+                        value = get_input()
+                    except Empty:
+                        self._waiting = True
+                        return False
+                    dst = p1 if m1 == 0 else rb + p1
+                    ip += 2
+                else:
+                    # Parameter modes: 0 position, 1 immediate, 2 relative
+                    if m1 == 1:
+                        x = p1
+                    else:
+                        a = p1 if m1 == 0 else rb + p1
+                        x = pages[a >> shift][a & mask] if 0 <= a < n else mem[a]
+                    dst = None
+                    if op == 4:
+                        put_output(x)
+                        ip += 2
+                    elif op == 9:
+                        rb += x
+                        ip += 2
+                    else:
+                        if m2 == 1:
+                            y = p2
+                        else:
+                            a = p2 if m2 == 0 else rb + p2
+                            y = pages[a >> shift][a & mask] if 0 <= a < n else mem[a]
+                        if op == 5:
+                            ip = y if x != 0 else ip + 3
+                        elif op == 6:
+                            ip = y if x == 0 else ip + 3
+                        else:
+                            if op == 1:
+                                value = x + y
+                            elif op == 2:
+                                value = x * y
+                            elif op == 7:
+                                value = int(x < y)
+                            else:
+                                value = int(x == y)
+                            dst = p3 if m3 == 0 else rb + p3
+                            ip += 4
+
+                if dst is not None:
+                    if 0 <= dst < n and owned[dst >> shift]:
+                        pages[dst >> shift][dst & mask] = value
+                    else:
+                        mem[dst] = value
+                        n = len(pages) << shift
+                    if dst in code:
+                        self._invalidate(dst)
+
+                count += 1
+                if single_step:
+                    return True
+        finally:
+            self._instruction_ptr = ip
+            self._relative_base = rb
+            self._instruction_count += count
+
+    def step(self):
+        """
+        Execute a single instruction.
+
+        Returns False if the program has halted or is waiting for input,
+        True otherwise.
+        """
+        if self._halted:
+            return False
+        return self._execute(single_step=True)
+
+    def run(self):
+        """Run until the program halts or needs input that isn't there."""
+        if not self._halted:
+            self._execute(single_step=False)
+
+
+def run_program(memory_data, inputs=()):
+    """Run a program to completion on `inputs` and return all its output."""
+    program = Program(memory_data)
+    program.feed(*inputs)
+    program.run()
+    if not program.halted():
+        raise RuntimeError("Program is waiting for more input")
+    return program.drain()